@@ -0,0 +1,280 @@
+import threading
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from datetime import date, timedelta
+try:
+    import numpy as np
+except ImportError:  # optional: without it reports and rebuilds loop over records
+    np = None
+
+from stats import quiz_score
+from storage import parse_time
+
+DAY_MS = 86400000
+EPOCH = date(1970, 1, 1)
+NO_DAY = -(2 ** 62)  # day column value for quizzes without a readable date
+GROUP_FIELDS = ("topic", "difficulty", "day")
+HISTOGRAM_BUCKETS = 10  # scores 0-9, 10-19, ..., 90-100
+LOW_SCORE = 60
+CATEGORY_FIELDS = ("topic", "difficulty", "user_id")
+
+
+def day_number(value):
+    # Days since 1970-01-01 for a YYYY-MM-DD date or anything parse_time reads
+    if isinstance(value, str):
+        try:
+            return (date.fromisoformat(value.strip()) - EPOCH).days
+        except ValueError:
+            pass
+    ms = parse_time(value)
+    return None if ms is None else ms // DAY_MS
+
+
+def day_label(day):
+    return None if day is None else (EPOCH + timedelta(days=day)).isoformat()
+
+
+def _new_cell():
+    return {"count": 0, "sum": 0.0, "min": None, "max": None, "histogram": [0] * HISTOGRAM_BUCKETS}
+
+
+def _merge(into, cell):
+    into["count"] += cell["count"]
+    into["sum"] += cell["sum"]
+    if cell["min"] is not None and (into["min"] is None or cell["min"] < into["min"]):
+        into["min"] = cell["min"]
+    if cell["max"] is not None and (into["max"] is None or cell["max"] > into["max"]):
+        into["max"] = cell["max"]
+    for i, n in enumerate(cell["histogram"]):
+        into["histogram"][i] += n
+
+
+class AnalyticsCube:
+    """Quiz score rollups per (topic, difficulty, day).
+
+    Each stored quiz updates one cell, and a query merges cells, so answering
+    costs O(topics x difficulties x days in range) no matter how many quiz
+    rows are behind them. Quizzes without a readable date land in day None,
+    which only unbounded queries include.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clear()
+
+    def _clear(self):
+        self._days = {}         # day -> {(topic, difficulty): cell}
+        self._dated = []        # sorted days that have cells, None excluded
+
+    def reset(self):
+        with self._lock:
+            self._clear()
+
+    def rebuild(self, data):
+        quizzes = data.get("quizzes", ())
+        with self._lock:
+            self._clear()
+            if np is None:
+                for record in quizzes:
+                    self._add(record)
+                return
+            for day, topic, difficulty, cell in QuizTable.of(quizzes).cube_cells():
+                if day not in self._days:
+                    self._days[day] = {}
+                    if day is not None:
+                        insort(self._dated, day)
+                self._days[day][(topic, difficulty)] = cell
+
+    def add(self, collection, record):
+        if collection != "quizzes":
+            return
+        with self._lock:
+            self._add(record)
+
+    def _add(self, record):
+        day = day_number(record.get("quiz_date"))
+        cells = self._days.get(day)
+        if cells is None:
+            cells = self._days[day] = {}
+            if day is not None:
+                insort(self._dated, day)
+        key = (record.get("topic"), record.get("difficulty"))
+        cell = cells.get(key)
+        if cell is None:
+            cell = cells[key] = _new_cell()
+        score = quiz_score(record)
+        cell["count"] += 1
+        cell["sum"] += score
+        if cell["min"] is None or score < cell["min"]:
+            cell["min"] = score
+        if cell["max"] is None or score > cell["max"]:
+            cell["max"] = score
+        cell["histogram"][min(max(int(score // 10), 0), HISTOGRAM_BUCKETS - 1)] += 1
+
+    def query(self, group_by=("topic", "difficulty"), start=None, end=None):
+        # start and end are inclusive day numbers; None leaves that side open
+        with self._lock:
+            lo = 0 if start is None else bisect_left(self._dated, start)
+            hi = len(self._dated) if end is None else bisect_right(self._dated, end)
+            days = self._dated[lo:hi]
+            if start is None and end is None and None in self._days:
+                days.append(None)
+            groups = {}
+            for day in days:
+                for (topic, difficulty), cell in self._days[day].items():
+                    values = {"topic": topic, "difficulty": difficulty, "day": day}
+                    key = tuple(values[f] for f in group_by)
+                    group = groups.get(key)
+                    if group is None:
+                        group = groups[key] = _new_cell()
+                    _merge(group, cell)
+        out = []
+        for key, cell in groups.items():
+            row = dict(zip(group_by, key))
+            if "day" in row:
+                row["day"] = day_label(row["day"])
+            row.update(cell)
+            row["average"] = cell["sum"] / cell["count"] if cell["count"] else 0.0
+            out.append(row)
+        return out
+
+
+class QuizTable:
+    """Quizzes as columns, for batch reports and rebuilds (needs numpy).
+
+    ``score`` is float64; topic, difficulty and user_id are int32 codes into
+    ``categories[field]``; ``day`` holds day numbers, NO_DAY when undated.
+    """
+
+    def __init__(self, score, codes, categories, day):
+        self.score = score
+        self.codes = codes
+        self.categories = categories
+        self.day = day
+
+    @classmethod
+    def from_records(cls, quizzes):
+        lookup = {field: {} for field in CATEGORY_FIELDS}
+        columns = {field: array("i") for field in CATEGORY_FIELDS}
+        score, day = array("d"), array("q")
+        for record in quizzes:
+            score.append(quiz_score(record))
+            for field, codes in lookup.items():
+                value = record.get(field)
+                code = codes.get(value)
+                if code is None:
+                    code = codes[value] = len(codes)
+                columns[field].append(code)
+            d = day_number(record.get("quiz_date"))
+            day.append(NO_DAY if d is None else d)
+        return cls(np.frombuffer(score, dtype=np.float64),
+                   {field: np.frombuffer(col, dtype=np.int32) for field, col in columns.items()},
+                   {field: list(codes) for field, codes in lookup.items()},
+                   np.frombuffer(day, dtype=np.int64))
+
+    @classmethod
+    def of(cls, quizzes):
+        # quizzes backed by the columnar archive hand over their columns as is
+        table = getattr(quizzes, "table", None)
+        return table() if table is not None else cls.from_records(quizzes)
+
+    @classmethod
+    def concat(cls, tables):
+        lookup = {field: {} for field in CATEGORY_FIELDS}
+        codes = {field: [] for field in CATEGORY_FIELDS}
+        for t in tables:
+            for field, values in lookup.items():
+                remap = np.array([values.setdefault(v, len(values)) for v in t.categories[field]], dtype=np.int32)
+                codes[field].append(remap[t.codes[field]])
+        return cls(np.concatenate([t.score for t in tables]),
+                   {field: np.concatenate(parts) for field, parts in codes.items()},
+                   {field: list(values) for field, values in lookup.items()},
+                   np.concatenate([t.day for t in tables]))
+
+    def __len__(self):
+        return len(self.score)
+
+    def _grouped(self, field):
+        n = len(self.categories[field])
+        codes = self.codes[field]
+        return np.bincount(codes, minlength=n), np.bincount(codes, weights=self.score, minlength=n)
+
+    def reports(self, users, k=10, active_k=5, low=LOW_SCORE):
+        out = {}
+        for name, field in (("subject_performance", "topic"), ("difficulty_analysis", "difficulty")):
+            count, total = self._grouped(field)
+            out[name] = [{field: value, "count": int(c), "average": float(t / c)}
+                         for value, c, t in zip(self.categories[field], count, total) if c]
+        count, total = self._grouped("user_id")
+        ids = self.categories["user_id"]
+        student = np.array([users.get(u, {}).get("role") == "student" for u in ids], dtype=bool)
+        average = np.divide(total, count, out=np.zeros(len(count)), where=count > 0)
+        members = np.flatnonzero(student & (count > 0))
+
+        def rows(positions):
+            return [{"user_id": ids[i], "username": users[ids[i]].get("username"),
+                     "average_score": float(average[i]), "total_quizzes": int(count[i])} for i in positions]
+
+        out["top"] = rows(members[np.argsort(-average[members], kind="stable")][:k])
+        out["most_active"] = rows(members[np.argsort(-count[members], kind="stable")][:active_k])
+        low_members = members[average[members] < low]
+        out["low_performers"] = rows(low_members[np.argsort(average[low_members], kind="stable")])
+        return out
+
+    def cube_cells(self):
+        # (day, topic, difficulty, cell) for every non-empty rollup cell, in
+        # the shape AnalyticsCube keeps them
+        if not len(self):
+            return
+        topics, difficulties = self.categories["topic"], self.categories["difficulty"]
+        dated = self.day != NO_DAY
+        first = int(self.day[dated].min()) if dated.any() else 0
+        slot = np.where(dated, self.day - first + 1, 0)
+        key = (slot * len(topics) + self.codes["topic"]) * len(difficulties) + self.codes["difficulty"]
+        keys, inverse = np.unique(key, return_inverse=True)
+        count = np.bincount(inverse)
+        total = np.bincount(inverse, weights=self.score)
+        ordered = self.score[np.argsort(inverse, kind="stable")]
+        starts = np.concatenate(([0], np.cumsum(count)[:-1]))
+        low, high = np.minimum.reduceat(ordered, starts), np.maximum.reduceat(ordered, starts)
+        bucket = np.clip(self.score // 10, 0, HISTOGRAM_BUCKETS - 1).astype(np.int64)
+        histogram = np.bincount(inverse * HISTOGRAM_BUCKETS + bucket,
+                                minlength=len(keys) * HISTOGRAM_BUCKETS).reshape(-1, HISTOGRAM_BUCKETS)
+        for i, k in enumerate(keys.tolist()):
+            rest, difficulty = divmod(k, len(difficulties))
+            s, topic = divmod(rest, len(topics))
+            yield (None if s == 0 else first + s - 1), topics[topic], difficulties[difficulty], {
+                "count": int(count[i]), "sum": float(total[i]), "min": float(low[i]), "max": float(high[i]),
+                "histogram": histogram[i].tolist()}
+
+
+def loop_reports(quizzes, users, k=10, active_k=5, low=LOW_SCORE):
+    # The same reports as QuizTable.reports, one record at a time
+    out = {"subject_performance": {}, "difficulty_analysis": {}}
+    per_user = {}
+    for record in quizzes:
+        score = quiz_score(record)
+        for name, field in (("subject_performance", "topic"), ("difficulty_analysis", "difficulty")):
+            group = out[name].setdefault(record.get(field), [0, 0.0])
+            group[0] += 1
+            group[1] += score
+        user = per_user.setdefault(record.get("user_id"), [0, 0.0])
+        user[0] += 1
+        user[1] += score
+    for name, field in (("subject_performance", "topic"), ("difficulty_analysis", "difficulty")):
+        out[name] = [{field: value, "count": c, "average": t / c} for value, (c, t) in out[name].items()]
+    students = [{"user_id": u, "username": users[u].get("username"), "average_score": t / c, "total_quizzes": c}
+                for u, (c, t) in per_user.items() if users.get(u, {}).get("role") == "student"]
+    out["top"] = sorted(students, key=lambda s: -s["average_score"])[:k]
+    out["most_active"] = sorted(students, key=lambda s: -s["total_quizzes"])[:active_k]
+    out["low_performers"] = sorted((s for s in students if s["average_score"] < low),
+                                   key=lambda s: s["average_score"])
+    return out
+
+
+def batch_reports(quizzes, users, **kwargs):
+    # Educator reports over a full quiz history: vectorized when numpy is
+    # installed, plain loops otherwise
+    if np is None:
+        return loop_reports(quizzes, users, **kwargs)
+    return QuizTable.of(quizzes).reports(users, **kwargs)
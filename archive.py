@@ -0,0 +1,289 @@
+import json, mmap, os, threading
+from array import array
+from bisect import bisect_left, bisect_right
+from contextlib import contextmanager
+from itertools import chain
+try:
+    import fcntl
+except ImportError:  # not on Windows: single-process only there
+    fcntl = None
+
+from analytics import DAY_MS, NO_DAY, QuizTable, np
+from stats import quiz_score
+from storage import parse_time
+
+# One file per fixed-width column: name -> array typecode. "rest" is the byte
+# offset of the row's leftover fields in rest.jsonl.
+ARCHIVE_COLUMNS = {"seq": "q", "ts": "q", "score": "d", "topic": "i", "difficulty": "i", "user_id": "i", "rest": "q"}
+CODED_FIELDS = ("topic", "difficulty", "user_id")
+NO_TIME = -(2 ** 63)
+SCAN_CHUNK = 65536
+
+
+def _codable(value):
+    return value is None or isinstance(value, (str, int, float)) and not isinstance(value, bool)
+
+
+class QuizArchive:
+    """Old quiz attempts in a columnar directory, read through mmap.
+
+    topic, difficulty and user_id are int32 codes into per-column dictionaries
+    kept in meta.json; score is float64 and the quiz date int64 epoch ms, read
+    back as epoch ms whatever string it was archived as. Any other field
+    (quiz_id, feedback, answers, and unreadable dates or scores that do not
+    round-trip through the columns) goes to rest.jsonl. Rows are only ever
+    appended, in seq order; meta.json is replaced last, so a crash mid-append
+    leaves bytes past the committed row count that the next append truncates.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.meta_path = os.path.join(path, "meta.json")
+        self._lock = threading.RLock()
+        self._sig = None
+        self._state = self._empty_state()
+
+    @staticmethod
+    def _empty_state():
+        return {"rows": 0, "last_seq": None, "rest_bytes": 0, "ts_sorted": True,
+                "categories": {f: [] for f in CODED_FIELDS}, "codes": {f: {} for f in CODED_FIELDS},
+                "columns": {name: array(code) for name, code in ARCHIVE_COLUMNS.items()},
+                "rest": b""}
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    def _signature(self):
+        try:
+            st = os.stat(self.meta_path)
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def _map(self, name, length):
+        if not length:
+            return b""
+        with open(self._file(name), "rb") as f:
+            return mmap.mmap(f.fileno(), length, access=mmap.ACCESS_READ)
+
+    def _open(self):
+        with open(self.meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        rows = meta["rows"]
+        state = dict(meta, codes={f: {v: i for i, v in enumerate(meta["categories"][f])} for f in CODED_FIELDS})
+        state["columns"] = {
+            name: memoryview(self._map(name + ".col", rows * array(code).itemsize)).cast(code)
+            for name, code in ARCHIVE_COLUMNS.items()}
+        state["rest"] = self._map("rest.jsonl", meta["rest_bytes"])
+        return state
+
+    def refresh(self):
+        # Pick up rows archived since the last look (by this or another process)
+        sig = self._signature()
+        if sig == self._sig:
+            return self._state
+        with self._lock:
+            if sig != self._sig:
+                self._state = self._open() if sig is not None else self._empty_state()
+                self._sig = sig
+            return self._state
+
+    def __len__(self):
+        return self.refresh()["rows"]
+
+    def last_seq(self):
+        return self.refresh()["last_seq"]
+
+    def _row(self, state, i):
+        cols = state["columns"]
+        end = cols["rest"][i + 1] if i + 1 < state["rows"] else state["rest_bytes"]
+        rest = json.loads(state["rest"][cols["rest"][i]:end])
+        record = {}
+        for field in CODED_FIELDS:
+            code = cols[field][i]
+            if code >= 0:
+                record[field] = state["categories"][field][code]
+        record.update(rest)
+        if "score" not in rest:
+            record["score"] = cols["score"][i]
+        if cols["ts"][i] != NO_TIME:
+            # also replaces the locale strings older versions kept in rest
+            record["quiz_date"] = cols["ts"][i]
+        return record
+
+    def records(self):
+        state = self.refresh()
+        for i in range(state["rows"]):
+            yield self._row(state, i)
+
+    def _matches(self, state, start, end, want, since, backwards=False):
+        # Row numbers in [start, end) whose coded columns equal want and whose
+        # time is at least since; vectorized a chunk at a time with numpy
+        cols = state["columns"]
+        if np is None:
+            for i in (range(end - 1, start - 1, -1) if backwards else range(start, end)):
+                if all(cols[f][i] == code for f, code in want.items()) and (since is None or cols["ts"][i] >= since):
+                    yield i
+            return
+        arrays = {f: np.frombuffer(cols[f], dtype=np.int32) for f in want}
+        ts = np.frombuffer(cols["ts"], dtype=np.int64)
+        chunks = [(lo, min(lo + SCAN_CHUNK, end)) for lo in range(start, end, SCAN_CHUNK)]
+        for lo, hi in (reversed(chunks) if backwards else chunks):
+            mask = np.ones(hi - lo, dtype=bool)
+            for f, code in want.items():
+                mask &= arrays[f][lo:hi] == code
+            if since is not None:
+                mask &= ts[lo:hi] >= since
+            hits = np.flatnonzero(mask).tolist()
+            for i in (reversed(hits) if backwards else hits):
+                yield lo + i
+
+    def query(self, filters=None, after=None, since=None, limit=50, newest_first=False):
+        # Same contract as the stores' query: (seq, record) pairs, seq > after
+        # (newest_first: newest first, seq < after)
+        state = self.refresh()
+        want, others = {}, {}
+        for field, value in (filters or {}).items():
+            if field in CODED_FIELDS:
+                code = state["codes"][field].get(value) if _codable(value) else None
+                if code is None:
+                    return []
+                want[field] = code
+            else:
+                others[field] = value
+        seqs = state["columns"]["seq"]
+        if newest_first:
+            start, end = 0, state["rows"] if after is None else bisect_left(seqs, after)
+        else:
+            start, end = 0 if after is None else bisect_right(seqs, after), state["rows"]
+        if since is not None and state.get("ts_sorted"):
+            # rows were archived in time order: skip straight to since
+            start = max(start, bisect_left(state["columns"]["ts"], since))
+        out = []
+        for i in self._matches(state, start, end, want, since, newest_first):
+            record = self._row(state, i)
+            if any(record.get(f) != v for f, v in others.items()):
+                continue
+            out.append((state["columns"]["seq"][i], record))
+            if len(out) >= limit:
+                break
+        return out
+
+    def table(self):
+        # The archived rows as a QuizTable over the mapped columns (no copy)
+        state = self.refresh()
+        cols = state["columns"]
+        codes, categories = {}, {}
+        for field in CODED_FIELDS:
+            column = np.frombuffer(cols[field], dtype=np.int32)
+            categories[field] = list(state["categories"][field])
+            if (column < 0).any():
+                # fields missing or stored in rest.jsonl count as None
+                column = np.where(column < 0, len(categories[field]), column).astype(np.int32)
+                categories[field].append(None)
+            codes[field] = column
+        ts = np.frombuffer(cols["ts"], dtype=np.int64)
+        day = np.where(ts == NO_TIME, NO_DAY, ts // DAY_MS)
+        return QuizTable(np.frombuffer(cols["score"], dtype=np.float64), codes, categories, day)
+
+    def chain(self, live):
+        # The live quizzes with the archived ones in front
+        return ArchivedQuizzes(self, live) if len(self) else live
+
+    @contextmanager
+    def _locked(self):
+        with self._lock:
+            os.makedirs(self.path, exist_ok=True)
+            if fcntl is None:
+                yield
+                return
+            with open(self._file("lock"), "a") as lf:
+                fcntl.flock(lf, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lf, fcntl.LOCK_UN)
+
+    def append(self, rows):
+        # Archive (seq, record) pairs, seqs ascending; rows at or below the
+        # archived last_seq are skipped, so a repeated run is harmless
+        with self._locked():
+            self._sig = None
+            state = self.refresh()
+            if state["last_seq"] is not None:
+                rows = [(seq, record) for seq, record in rows if seq > state["last_seq"]]
+            if not rows:
+                return 0
+            categories = {f: list(state["categories"][f]) for f in CODED_FIELDS}
+            codes = {f: dict(state["codes"][f]) for f in CODED_FIELDS}
+            columns = {name: array(code) for name, code in ARCHIVE_COLUMNS.items()}
+            rest_bytes = state["rest_bytes"]
+            # archives from before ts_sorted was kept are taken as unsorted
+            ts_sorted = state.get("ts_sorted", False)
+            last_ts = state["columns"]["ts"][state["rows"] - 1] if state["rows"] else NO_TIME
+            lines = []
+            for seq, record in rows:
+                rest = dict(record)
+                columns["seq"].append(seq)
+                ts = parse_time(record.get("quiz_date"))
+                ts = NO_TIME if ts is None else ts
+                ts_sorted = ts_sorted and ts >= last_ts
+                last_ts = ts
+                columns["ts"].append(ts)
+                if ts != NO_TIME:
+                    del rest["quiz_date"]
+                columns["score"].append(quiz_score(record))
+                if type(record.get("score")) is float:
+                    del rest["score"]
+                for field in CODED_FIELDS:
+                    value = record.get(field)
+                    if field not in record or not _codable(value):
+                        columns[field].append(-1)
+                        continue
+                    code = codes[field].get(value)
+                    if code is None:
+                        code = codes[field][value] = len(categories[field])
+                        categories[field].append(value)
+                    columns[field].append(code)
+                    del rest[field]
+                line = json.dumps(rest, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+                columns["rest"].append(rest_bytes)
+                rest_bytes += len(line)
+                lines.append(line)
+            for name, values in columns.items():
+                self._extend(name + ".col", state["rows"] * values.itemsize, values.tobytes())
+            self._extend("rest.jsonl", state["rest_bytes"], b"".join(lines))
+            meta = {"rows": state["rows"] + len(rows), "last_seq": rows[-1][0], "rest_bytes": rest_bytes,
+                    "ts_sorted": ts_sorted, "categories": categories}
+            tmp = self.meta_path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(meta, f, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.meta_path)
+            return len(rows)
+
+    def _extend(self, name, committed, chunk):
+        # drop whatever an interrupted append left past the committed size
+        with open(self._file(name), "ab") as f:
+            f.truncate(committed)
+            f.write(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+
+
+class ArchivedQuizzes:
+    """Archived quizzes followed by the live ones, iterable as one sequence."""
+
+    def __init__(self, archive, live):
+        self.archive = archive
+        self.live = live
+
+    def __iter__(self):
+        return chain(self.archive.records(), self.live)
+
+    def __len__(self):
+        return len(self.archive) + len(self.live)
+
+    def table(self):
+        return QuizTable.concat([self.archive.table(), QuizTable.from_records(self.live)])
@@ -0,0 +1,245 @@
+"""ASGI entry point for EduTutor AI: ``uvicorn asgi:app`` (any ASGI server works).
+
+Ordinary requests run the Flask app on a bounded thread pool, so storage I/O
+never blocks the event loop and a slow client costs a socket, not a thread.
+/api/events streams are served on the loop itself: an idle subscriber is a
+coroutine waiting on its queue instead of a thread parked in a view.
+"""
+import asyncio, sys, threading
+from concurrent.futures import ThreadPoolExecutor
+from tempfile import SpooledTemporaryFile
+from urllib.parse import parse_qs
+
+from app import EVENT_HEARTBEAT, EVENT_POLL, app as flask_app, events, store
+from events import sse
+
+WSGI_THREADS = 32                 # Flask requests running at once; the rest wait on the loop
+MAX_ASYNC_EVENT_STREAMS = 10000   # open /api/events connections per process
+BODY_SPOOL = 1 << 20              # request bodies past this many bytes are spooled to disk
+SEND_BUFFER = 65536               # response bytes handed to the loop at a time
+
+_pool = ThreadPoolExecutor(max_workers=WSGI_THREADS, thread_name_prefix="wsgi")
+_poller = None
+
+
+async def _run_sync(fn, *args):
+    return await asyncio.get_running_loop().run_in_executor(_pool, fn, *args)
+
+
+async def _poll_store():
+    # One store.refresh() per EVENT_POLL for the whole process while any
+    # stream is open, which is how creates made by other worker processes
+    # reach the event hub; the streams themselves sleep until woken
+    while len(events):
+        await asyncio.sleep(EVENT_POLL)
+        await _run_sync(store.refresh)
+
+
+class _Waker:
+    """Wakes stream coroutines from publishing threads, one loop hop per batch.
+
+    call_soon_threadsafe writes to the loop's self-pipe every time; a create
+    fanned out to thousands of streams would pay that per stream.
+    """
+
+    def __init__(self, loop):
+        self.loop = loop
+        self._lock = threading.Lock()
+        self._pending = []
+        self._scheduled = False
+
+    def wake(self, event):
+        with self._lock:
+            self._pending.append(event)
+            if self._scheduled:
+                return
+            self._scheduled = True
+        self.loop.call_soon_threadsafe(self._run)
+
+    def _run(self):
+        with self._lock:
+            pending, self._pending, self._scheduled = self._pending, [], False
+        for event in pending:
+            event.set()
+
+
+_wakers = {}
+
+
+async def _read_body(receive):
+    body = SpooledTemporaryFile(max_size=BODY_SPOOL)
+    more = True
+    while more:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return None
+        body.write(message.get("body", b""))
+        more = message.get("more_body", False)
+    body.seek(0)
+    return body
+
+
+def _environ(scope, body):
+    server = scope.get("server") or ("localhost", 80)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+        "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope["query_string"].decode("latin-1"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": "HTTP/%s" % scope["http_version"],
+        "REMOTE_ADDR": scope["client"][0] if scope.get("client") else "",
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": body,
+        "wsgi.input_terminated": True,
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    for name, value in scope["headers"]:
+        name = name.decode("latin-1").upper().replace("-", "_")
+        value = value.decode("latin-1")
+        if name not in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+            name = "HTTP_" + name
+        environ[name] = environ[name] + "," + value if name in environ else value
+    # the whole body is already here, whatever framing the client used
+    body.seek(0, 2)
+    environ["CONTENT_LENGTH"] = str(body.tell())
+    body.seek(0)
+    return environ
+
+
+def _run_wsgi(environ, send):
+    # On a pool thread: run the Flask app and hand its response to the loop,
+    # waiting for each send so a slow reader slows us down
+    response = {}
+
+    def start_response(status, headers, exc_info=None):
+        response["start"] = {"type": "http.response.start", "status": int(status.split(" ", 1)[0]),
+                             "headers": [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in headers]}
+
+    result = flask_app(environ, start_response)
+    try:
+        # chunks are gathered up to SEND_BUFFER so a small response costs
+        # one hop to the loop, start line and body together
+        messages, buffered, size = [], [], 0
+        for chunk in result:
+            if not chunk:
+                continue
+            if "start" in response:
+                messages.append(response.pop("start"))
+            buffered.append(chunk)
+            size += len(chunk)
+            if size >= SEND_BUFFER:
+                messages.append({"type": "http.response.body", "body": b"".join(buffered), "more_body": True})
+                send(messages)
+                messages, buffered, size = [], [], 0
+        if "start" in response:
+            messages.append(response.pop("start"))
+        messages.append({"type": "http.response.body", "body": b"".join(buffered)})
+        send(messages)
+    finally:
+        close = getattr(result, "close", None)
+        if close is not None:
+            close()
+
+
+async def _wsgi(scope, receive, send):
+    body = await _read_body(receive)
+    if body is None:
+        return
+    loop = asyncio.get_running_loop()
+
+    async def send_all(messages):
+        for message in messages:
+            await send(message)
+
+    def send_sync(messages):
+        asyncio.run_coroutine_threadsafe(send_all(messages), loop).result()
+    try:
+        await _run_sync(_run_wsgi, _environ(scope, body), send_sync)
+    finally:
+        body.close()
+
+
+async def _json(send, status, text):
+    await send({"type": "http.response.start", "status": status,
+                "headers": [(b"content-type", b"application/json")]})
+    await send({"type": "http.response.body", "body": text.encode("utf-8")})
+
+
+async def _events(scope, receive, send):
+    # /api/events on the loop: same stream as app.event_stream, no thread held
+    user_id = parse_qs(scope["query_string"].decode("latin-1")).get("user_id", [None])[0]
+    rows = await _run_sync(lambda: store.query("users", {"user_id": user_id}, limit=1))
+    if not rows:
+        await _json(send, 404, '{"isOk":false,"message":"Unknown user"}')
+        return
+    if len(events) >= MAX_ASYNC_EVENT_STREAMS:
+        await _json(send, 503, '{"isOk":false,"message":"Server busy, please try again"}')
+        return
+    loop = asyncio.get_running_loop()
+    wakeup = asyncio.Event()
+    gone = []
+
+    async def watch():
+        while (await receive())["type"] != "http.disconnect":
+            pass
+        gone.append(True)
+        wakeup.set()
+
+    watcher = asyncio.ensure_future(watch())
+    user = rows[0][1]
+    waker = _wakers.get(loop)
+    if waker is None:
+        waker = _wakers[loop] = _Waker(loop)
+    sub = events.subscribe(user.get("user_id"), user.get("role"), wake=lambda: waker.wake(wakeup))
+    global _poller
+    if _poller is None or _poller.done():
+        _poller = asyncio.ensure_future(_poll_store())
+    try:
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"content-type", b"text/event-stream; charset=utf-8"),
+                                (b"cache-control", b"no-cache"), (b"x-accel-buffering", b"no")]})
+        await send({"type": "http.response.body", "body": b"retry: 3000\n\n", "more_body": True})
+        while not gone:
+            try:
+                await asyncio.wait_for(wakeup.wait(), EVENT_HEARTBEAT)
+            except asyncio.TimeoutError:
+                pass
+            wakeup.clear()
+            queued, dropped = events.take(sub, 0)
+            parts = [sse("dropped", {"count": dropped})] if dropped else []
+            parts += queued or [": ping\n\n"]
+            if not gone:
+                await send({"type": "http.response.body", "body": "".join(parts).encode("utf-8"), "more_body": True})
+    finally:
+        watcher.cancel()
+        events.unsubscribe(sub)
+
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await _run_sync(store.load)
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await _run_sync(store.close)
+            _pool.shutdown(wait=False)
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        await _lifespan(receive, send)
+    elif scope["type"] != "http":
+        raise ValueError("Unsupported ASGI scope %r" % scope["type"])
+    elif scope["method"] == "GET" and scope["path"] == "/api/events":
+        await _events(scope, receive, send)
+    else:
+        await _wsgi(scope, receive, send)
@@ -0,0 +1,474 @@
+"""Micro-benchmarks for EduTutor AI.
+
+    python bench.py writes --processes 4 --threads 16 --records 500
+    python bench.py index --requests 2000
+    python bench.py sample --sizes 1000 100000 1000000 --k 15
+    python bench.py leaderboard --students 100000 --quizzes 5
+    python bench.py analytics --rows 10000000
+    python bench.py archive --rows 1000000
+    python bench.py bulk --mode json --rows 2000
+    python bench.py export --rows 200000
+    python bench.py serve --idle 2000 --requests 5000 --concurrency 50
+"""
+import argparse, asyncio, json, multiprocessing, os, random, shutil, socket, subprocess, sys, tempfile, threading, time
+import tracemalloc
+
+import analytics
+from archive import QuizArchive
+from questions import sample_indices
+from stats import Leaderboard
+from storage import DataStore, SqliteStore
+
+
+def _open(path, mode):
+    if mode == "sqlite":
+        return SqliteStore(path)
+    return DataStore(path, mode=mode)
+
+
+def _write_worker(path, mode, proc, threads, records):
+    store = _open(path, mode)
+    store.load()
+
+    def run(t):
+        for i in range(records):
+            store.insert("quizzes", {"quiz_id": "%d-%d-%d" % (proc, t, i), "user_id": "u%d" % t, "score": 50.0})
+
+    workers = [threading.Thread(target=run, args=(t,)) for t in range(threads)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    store.close()
+
+
+def bench_writes(args):
+    tmp = tempfile.mkdtemp(prefix="edututor-bench-")
+    path = os.path.join(tmp, "data.json")
+    try:
+        _open(path, args.mode).load()
+        procs = [multiprocessing.Process(target=_write_worker, args=(path, args.mode, p, args.threads, args.records))
+                 for p in range(args.processes)]
+        start = time.perf_counter()
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join()
+        elapsed = time.perf_counter() - start
+        expected = args.processes * args.threads * args.records
+        quizzes = list(_open(path, args.mode).records("quizzes"))
+        ids = {q["quiz_id"] for q in quizzes}
+        print("mode=%s processes=%d threads=%d" % (args.mode, args.processes, args.threads))
+        print("%d creates in %.2fs (%.0f/s)" % (expected, elapsed, expected / elapsed))
+        print("stored=%d unique=%d lost=%d" % (len(quizzes), len(ids), expected - len(ids)))
+        return 0 if len(ids) == len(quizzes) == expected else 1
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def _rate(client, url, n, headers=None):
+    start = time.perf_counter()
+    for _ in range(n):
+        client.get(url, headers=headers)
+    return n / (time.perf_counter() - start)
+
+
+def bench_index(args):
+    from flask import Flask, render_template_string
+    import app as edututor
+
+    # the page as it used to be: one inline template rendered on every hit
+    with open(os.path.join(edututor.STATIC_DIR, "index.html"), encoding="utf-8") as f:
+        page = f.read()
+    for name, tag, ref in (("app.css", "style", '<link rel="stylesheet" href="/static/app.css" />'),
+                           ("app.js", "script", '<script src="/static/app.js"></script>')):
+        with open(os.path.join(edututor.STATIC_DIR, name), encoding="utf-8") as f:
+            page = page.replace(ref, "<%s>\n%s</%s>" % (tag, f.read(), tag))
+    legacy = Flask("legacy")
+    legacy.add_url_rule("/", "index", lambda: render_template_string(page))
+
+    client = edututor.app.test_client()
+    etag = client.get("/", headers={"Accept-Encoding": "gzip"}).headers["ETag"]
+    rows = [
+        ("render_template_string (before)", _rate(legacy.test_client(), "/", args.requests)),
+        ("prebuilt, identity", _rate(client, "/", args.requests)),
+        ("prebuilt, gzip", _rate(client, "/", args.requests, {"Accept-Encoding": "gzip"})),
+        ("prebuilt, 304 revalidation", _rate(client, "/", args.requests,
+                                             {"Accept-Encoding": "gzip", "If-None-Match": etag})),
+    ]
+    for label, rate in rows:
+        print("%-32s %8.0f req/s" % (label, rate))
+    return 0
+
+
+def _splice_sample(pool, k, rng):
+    # what the browser used to do: copy the pool, then remove each pick
+    available = list(pool)
+    return [available.pop(rng.randrange(len(available))) for _ in range(min(k, len(available)))]
+
+
+def bench_sample(args):
+    for size in args.sizes:
+        pool = list(range(size))
+        rng = random.Random(0)
+        start = time.perf_counter()
+        for _ in range(args.rounds):
+            _splice_sample(pool, args.k, rng)
+        splice = (time.perf_counter() - start) / args.rounds
+        start = time.perf_counter()
+        for _ in range(args.rounds):
+            [pool[i] for i in sample_indices(size, args.k, rng)]
+        fisher_yates = (time.perf_counter() - start) / args.rounds
+        print("pool=%-9d k=%-3d copy+splice %9.1f us   partial Fisher-Yates %6.1f us"
+              % (size, args.k, splice * 1e6, fisher_yates * 1e6))
+    return 0
+
+
+def _recompute_top(users, quizzes, k):
+    # what the browser used to do: average every student, then sort them all
+    totals = {}
+    for q in quizzes:
+        t = totals.setdefault(q["user_id"], [0.0, 0])
+        t[0] += q["score"]
+        t[1] += 1
+    rows = [(total / count, u) for u, (total, count) in totals.items() if users[u]["role"] == "student"]
+    rows.sort(key=lambda r: -r[0])
+    return rows[:k]
+
+
+def bench_leaderboard(args):
+    rng = random.Random(0)
+    topics = ["Mathematics", "Science", "History", "English"]
+    users = {"s%d" % i: {"user_id": "s%d" % i, "username": "student%d" % i, "role": "student"}
+             for i in range(args.students)}
+    quizzes = [{"user_id": "s%d" % rng.randrange(args.students), "topic": rng.choice(topics),
+                "score": float(rng.randrange(101))} for _ in range(args.students * args.quizzes)]
+
+    board = Leaderboard()
+    for u in users.values():
+        board.add("users", u)
+    start = time.perf_counter()
+    for q in quizzes:
+        board.add("quizzes", q)
+    elapsed = time.perf_counter() - start
+    print("students=%d quizzes=%d" % (args.students, len(quizzes)))
+    print("incremental updates %10.0f quizzes/s" % (len(quizzes) / elapsed))
+
+    start = time.perf_counter()
+    for _ in range(args.reads):
+        board.top(args.k), board.most_active(5), board.champions()
+    maintained = (time.perf_counter() - start) / args.reads
+    start = time.perf_counter()
+    for _ in range(max(1, args.reads // 100)):
+        _recompute_top(users, quizzes, args.k)
+    recompute = (time.perf_counter() - start) / max(1, args.reads // 100)
+    print("top-%d read: maintained %8.1f us   recompute+sort %10.1f us" % (args.k, maintained * 1e6, recompute * 1e6))
+    return 0
+
+
+def _synthetic_history(rows, students, seed=0):
+    rng = random.Random(seed)
+    topics = ["Mathematics", "Science", "History", "English"]
+    difficulties = ["Easy", "Medium", "Hard"]
+    days = [analytics.day_label(20000 + d) for d in range(365)]
+    for _ in range(rows):
+        yield {"user_id": "s%d" % rng.randrange(students), "topic": rng.choice(topics),
+               "difficulty": rng.choice(difficulties), "score": float(rng.randrange(101)),
+               "quiz_date": rng.choice(days)}
+
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def bench_analytics(args):
+    if analytics.np is None:
+        print("numpy is not installed")
+        return 1
+    users = {"s%d" % i: {"username": "student%d" % i, "role": "student"} for i in range(args.students)}
+
+    def history():
+        return _synthetic_history(args.rows, args.students)
+
+    _, generate = _timed(lambda: sum(1 for _ in history()))
+    _, loop = _timed(analytics.loop_reports, history(), users)
+    table, load = _timed(analytics.QuizTable.from_records, history())
+    _, vectorized = _timed(table.reports, users)
+    cube = analytics.AnalyticsCube()
+    _, cube_loop = _timed(lambda: [cube.add("quizzes", r) for r in history()])
+    _, cube_columnar = _timed(lambda: list(table.cube_cells()))
+    print("rows=%d students=%d (generating the rows alone: %.1fs)" % (args.rows, args.students, generate))
+    print("reports     dict loop %7.1fs   columnar load %7.1fs + vectorized %6.2fs" % (loop, load, vectorized))
+    print("cube build  dict loop %7.1fs   columnar (loaded) %6.2fs" % (cube_loop, cube_columnar))
+    return 0
+
+
+def _measured(fn):
+    # wall time untraced, then peak Python allocations in a traced second run
+    # (mmapped pages are not allocations, which is the point)
+    _, elapsed = _timed(fn)
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def bench_archive(args):
+    if analytics.np is None:
+        print("numpy is not installed")
+        return 1
+    users = {"s%d" % i: {"username": "student%d" % i, "role": "student"} for i in range(args.students)}
+    tmp = tempfile.mkdtemp(prefix="edututor-bench-")
+    try:
+        history = []
+        for i, q in enumerate(_synthetic_history(args.rows, args.students)):
+            q["quiz_id"] = "q%d" % i
+            q["quiz_date"] = analytics.day_number(q["quiz_date"]) * analytics.DAY_MS + 36000000  # 10:00 UTC, as stamped
+            q["feedback"] = analytics.quiz_score(q) >= 80 and "Excellent!" or "Keep practicing!"
+            history.append(q)
+        path = os.path.join(tmp, "quizzes.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(history, f, indent=2)
+        archive = QuizArchive(os.path.join(tmp, "archive"))
+        archive.append(list(enumerate(history)))
+        del history
+        archived = sum(os.path.getsize(os.path.join(archive.path, n)) for n in os.listdir(archive.path))
+
+        def from_json():
+            with open(path, encoding="utf-8") as f:
+                return analytics.QuizTable.from_records(json.load(f)).reports(users)
+
+        json_time, json_peak = _measured(from_json)
+        archive_time, archive_peak = _measured(lambda: archive.table().reports(users))
+        print("rows=%d" % args.rows)
+        print("on disk   pretty JSON %7.1f MB   archive %7.1f MB" % (os.path.getsize(path) / 1e6, archived / 1e6))
+        print("reports   from JSON %6.1fs, peak %7.1f MB   from archive %6.2fs, peak %6.1f MB"
+              % (json_time, json_peak / 1e6, archive_time, archive_peak / 1e6))
+        return 0
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def bench_bulk(args):
+    rows = [("users", {"user_id": "s%d" % i, "username": "student%d" % i, "role": "student"}, "username")
+            for i in range(args.rows)]
+    results = []
+    for label, load in (("one create per row", lambda store: [store.insert(*row) for row in rows]),
+                        ("insert_many", lambda store: store.insert_many(rows))):
+        tmp = tempfile.mkdtemp(prefix="edututor-bench-")
+        try:
+            store = _open(os.path.join(tmp, "data.json"), args.mode)
+            store.load()
+            _, elapsed = _timed(load, store)
+            store.close()
+            stored = sum(1 for _ in _open(os.path.join(tmp, "data.json"), args.mode).records("users"))
+            results.append((label, elapsed, stored))
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+    print("mode=%s rows=%d" % (args.mode, args.rows))
+    for label, elapsed, stored in results:
+        print("%-20s %8.2fs %10.0f rows/s  stored=%d" % (label, elapsed, args.rows / elapsed, stored))
+    return 0 if all(stored == args.rows for _, _, stored in results) else 1
+
+
+def bench_export(args):
+    tmp = tempfile.mkdtemp(prefix="edututor-bench-")
+    cwd = os.getcwd()
+    os.chdir(tmp)  # the app keeps its data files in the working directory
+    try:
+        import app as edututor
+        from flask import jsonify
+        edututor.store.insert_many([("quizzes", dict(q, quiz_id="q%d" % i), "quiz_id")
+                                    for i, q in enumerate(_synthetic_history(args.rows, 1000))])
+
+        def legacy():
+            # what /api/data used to do: one list, one jsonify
+            with edututor.app.app_context():
+                combined = [edututor.public_user(u) for u in edututor.store.records("users")]
+                combined.extend(edututor.store.records("quizzes"))
+                combined.extend(edututor.store.records("encouragements"))
+                return len(jsonify(combined).get_data())
+
+        def streamed():
+            return sum(len(chunk) for chunk in edututor.json_array_chunks(edututor.export_records()))
+
+        print("rows=%d" % args.rows)
+        for label, fn in (("list + jsonify (before)", legacy), ("streamed JSON array", streamed)):
+            elapsed, peak = _measured(fn)
+            print("%-26s %6.2fs   peak %8.1f MB" % (label, elapsed, peak / 1e6))
+        return 0
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+async def _request(port, method, path, body=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    head = "%s %s HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n" % (method, path)
+    if body is not None:
+        head += "Content-Type: application/json\r\nContent-Length: %d\r\n" % len(body)
+    writer.write(head.encode() + b"\r\n" + (body or b""))
+    response = await reader.read()
+    writer.close()
+    return int(response.split(b" ", 2)[1])
+
+
+async def _open_stream(port, path):
+    # an event stream that stays open and idle; (status, writer to close it with)
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(("GET %s HTTP/1.1\r\nHost: localhost\r\n\r\n" % path).encode())
+    status = int((await reader.readline()).split()[1])
+    return status, writer
+
+
+def _proc_status(pid):
+    with open("/proc/%d/status" % pid) as f:
+        fields = dict(line.split(":", 1) for line in f)
+    return int(fields["Threads"]), int(fields["VmRSS"].split()[0]) / 1024
+
+
+async def _load(port, pid, args):
+    # students: each create reaches a handful of streams, the rest sit idle
+    streams = await asyncio.gather(*[_open_stream(port, "/api/events?user_id=s%d" % (i % 100)) for i in range(args.idle)],
+                                   return_exceptions=True)
+    held = sum(1 for s in streams if not isinstance(s, BaseException) and s[0] == 200)
+    await asyncio.sleep(1)
+    latencies, statuses, next_id = [], {}, iter(range(args.requests))
+
+    async def client():
+        for i in next_id:
+            start = time.perf_counter()
+            if i % 10 == 0:
+                body = json.dumps({"encouragement_id": "bench-%d" % i, "educator_id": "t0",
+                                   "student_id": "s%d" % (i % 100), "message": "Keep going!"}).encode()
+                status = await _request(port, "POST", "/api/encouragements", body)
+            else:
+                status = await _request(port, "GET", "/api/leaderboard" if i % 2 else "/api/stats/student/s%d" % (i % 100))
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*[client() for _ in range(args.concurrency)])
+    elapsed = time.perf_counter() - start
+    threads, rss = _proc_status(pid)
+    for s in streams:
+        if not isinstance(s, BaseException):
+            s[1].close()
+    latencies.sort()
+    return held, elapsed, latencies, statuses, threads, rss
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def bench_serve(args):
+    here = os.path.dirname(os.path.abspath(__file__))
+    servers = [("wsgi (werkzeug, thread per connection)",
+                "from werkzeug.serving import run_simple\nfrom app import app, store\nstore.load()\n"
+                "run_simple('127.0.0.1', {port}, app, threaded=True)")]
+    try:
+        import uvicorn  # noqa: F401
+        servers.append(("asgi (uvicorn asgi:app)",
+                        "import uvicorn\nuvicorn.run('asgi:app', port={port}, log_level='warning', access_log=False)"))
+    except ImportError:
+        print("uvicorn is not installed; measuring the WSGI server only")
+    print("idle event streams=%d requests=%d concurrency=%d (1 in 10 a create)" % (args.idle, args.requests, args.concurrency))
+    for label, script in servers:
+        tmp = tempfile.mkdtemp(prefix="edututor-bench-")
+        try:
+            store = _open(os.path.join(tmp, "data.json"), "wal")
+            store.insert_many([("users", {"user_id": "t0", "username": "teacher", "role": "educator"}, None)]
+                              + [("users", {"user_id": "s%d" % i, "username": "student%d" % i, "role": "student"}, None)
+                                 for i in range(100)]
+                              + [("quizzes", {"quiz_id": "q%d" % i, "user_id": "s%d" % (i % 100), "topic": "Math",
+                                              "difficulty": "Easy", "score": float(i % 101)}, None) for i in range(1000)])
+            store.close()
+            port = _free_port()
+            server = subprocess.Popen([sys.executable, "-c", script.format(port=port)], cwd=tmp,
+                                      env=dict(os.environ, PYTHONPATH=here),
+                                      stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            try:
+                for _ in range(100):
+                    try:
+                        socket.create_connection(("127.0.0.1", port), timeout=1).close()
+                        break
+                    except OSError:
+                        time.sleep(0.1)
+                held, elapsed, latencies, statuses, threads, rss = asyncio.run(_load(port, server.pid, args))
+            finally:
+                server.terminate()
+                server.wait()
+            print("%-40s streams held %5d   %7.0f req/s   p50 %6.1f ms   p99 %7.1f ms   threads %5d   rss %6.1f MB   %s"
+                  % (label, held, len(latencies) / elapsed, latencies[len(latencies) // 2] * 1e3,
+                     latencies[int(len(latencies) * 0.99)] * 1e3, threads, rss,
+                     " ".join("%d:%d" % kv for kv in sorted(statuses.items()))))
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="bench", required=True)
+
+    p = sub.add_parser("writes", help="concurrent creates against one data file; checks nothing is lost")
+    p.add_argument("--mode", choices=("wal", "json", "sqlite"), default="wal")
+    p.add_argument("--processes", type=int, default=4)
+    p.add_argument("--threads", type=int, default=16)
+    p.add_argument("--records", type=int, default=250, help="creates per thread")
+    p.set_defaults(func=bench_writes)
+
+    p = sub.add_parser("index", help="requests/sec for the index page, old inline template vs prebuilt assets")
+    p.add_argument("--requests", type=int, default=2000)
+    p.set_defaults(func=bench_index)
+
+    p = sub.add_parser("sample", help="quiz question sampling cost by pool size")
+    p.add_argument("--sizes", type=int, nargs="+", default=[15, 1000, 100000, 1000000])
+    p.add_argument("--k", type=int, default=15)
+    p.add_argument("--rounds", type=int, default=50)
+    p.set_defaults(func=bench_sample)
+
+    p = sub.add_parser("leaderboard", help="maintained leaderboard vs recomputing it from every quiz")
+    p.add_argument("--students", type=int, default=100000)
+    p.add_argument("--quizzes", type=int, default=5, help="quizzes per student")
+    p.add_argument("--k", type=int, default=10)
+    p.add_argument("--reads", type=int, default=1000)
+    p.set_defaults(func=bench_leaderboard)
+
+    p = sub.add_parser("analytics", help="educator reports and rollups, dict loops vs numpy columns")
+    p.add_argument("--rows", type=int, default=10000000)
+    p.add_argument("--students", type=int, default=100000)
+    p.set_defaults(func=bench_analytics)
+
+    p = sub.add_parser("archive", help="disk and memory footprint of the columnar quiz archive vs JSON")
+    p.add_argument("--rows", type=int, default=1000000)
+    p.add_argument("--students", type=int, default=100000)
+    p.set_defaults(func=bench_archive)
+
+    p = sub.add_parser("bulk", help="importing a roster row by row vs as one batch")
+    p.add_argument("--mode", choices=("wal", "json", "sqlite"), default="json")
+    p.add_argument("--rows", type=int, default=2000)
+    p.set_defaults(func=bench_bulk)
+
+    p = sub.add_parser("export", help="peak memory of /api/data, built in one piece vs streamed")
+    p.add_argument("--rows", type=int, default=200000)
+    p.set_defaults(func=bench_export)
+
+    p = sub.add_parser("serve", help="HTTP throughput with idle event streams open, WSGI vs ASGI server")
+    p.add_argument("--idle", type=int, default=2000, help="event streams held open during the run")
+    p.add_argument("--requests", type=int, default=5000)
+    p.add_argument("--concurrency", type=int, default=50)
+    p.set_defaults(func=bench_serve)
+
+    args = parser.parse_args()
+    raise SystemExit(args.func(args))
+
+
+if __name__ == "__main__":
+    main()
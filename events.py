@@ -0,0 +1,125 @@
+import json, threading
+from collections import deque
+
+QUIZ_FIELDS = ("quiz_id", "user_id", "topic", "difficulty", "score", "quiz_date")
+ENCOURAGEMENT_FIELDS = ("encouragement_id", "educator_id", "student_id", "message", "sent_date")
+
+
+def sse(name, data):
+    return "event: %s\ndata: %s\n\n" % (name, json.dumps(data, ensure_ascii=False, separators=(",", ":")))
+
+
+class Subscriber:
+    """One live connection: who it is and its bounded queue of events.
+
+    ``wake``, if given, is called (on the publishing thread) after an event
+    is queued; connections served on an event loop use it instead of
+    blocking a thread in take().
+    """
+
+    def __init__(self, user_id, role, limit, wake=None):
+        self.user_id = user_id
+        self.role = role
+        self.wake = wake
+        self.events = deque(maxlen=limit)   # encoded with sse()
+        self.dropped = 0                    # events pushed out since the last take()
+
+
+class EventHub:
+    """Fans compact change events out to live event-stream connections.
+
+    Subscribed to the store like the aggregates, so it hears every create
+    from the write path: "quiz" and "encouragement" for new records, and
+    "leaderboard" whenever a quiz reorders the top ``top_k``. Educators get
+    everything; students their own quizzes, their inbox and the leaderboard.
+
+    Publishing never waits on a reader: each connection has its own queue
+    of ``queue_size`` events, and when it is full the oldest one is dropped
+    and counted so the reader knows to resync. Connections are filed by
+    educator and by student, so a create only visits its own recipients.
+    """
+
+    def __init__(self, leaderboard, queue_size=100, top_k=10):
+        self.leaderboard = leaderboard
+        self.queue_size = queue_size
+        self.top_k = top_k
+        self._cond = threading.Condition()
+        self._subscribers = set()
+        self._educators = set()
+        self._students = {}     # user_id -> that student's connections
+        self._top = None        # user_ids of the last announced top_k
+
+    def subscribe(self, user_id, role, wake=None):
+        sub = Subscriber(user_id, role, self.queue_size, wake)
+        with self._cond:
+            self._subscribers.add(sub)
+            if role == "educator":
+                self._educators.add(sub)
+            else:
+                self._students.setdefault(user_id, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._cond:
+            self._subscribers.discard(sub)
+            self._educators.discard(sub)
+            mine = self._students.get(sub.user_id)
+            if mine is not None:
+                mine.discard(sub)
+                if not mine:
+                    del self._students[sub.user_id]
+
+    def __len__(self):
+        return len(self._subscribers)
+
+    def reset(self):
+        self._top = None
+
+    def rebuild(self, data):
+        # a (re)load replays history: nothing new to announce
+        self._top = None
+
+    def add(self, collection, record):
+        if not self._subscribers:
+            self._top = None
+            return
+        if collection == "quizzes":
+            self._publish("quiz", {f: record.get(f) for f in QUIZ_FIELDS}, record.get("user_id"))
+            top = self.leaderboard.top(self.top_k)
+            ranks = [s["user_id"] for s in top]
+            if ranks != self._top:
+                self._top = ranks
+                self._publish("leaderboard", {"top": top}, None)
+        elif collection == "encouragements":
+            self._publish("encouragement", {f: record.get(f) for f in ENCOURAGEMENT_FIELDS},
+                          record.get("student_id"))
+
+    def _publish(self, name, data, student):
+        # to every connection when student is None, else to the educators
+        # and that student's own connections
+        text = sse(name, data)
+        with self._cond:
+            if student is None:
+                recipients = self._subscribers
+            else:
+                recipients = list(self._educators)
+                if isinstance(student, (str, int)):
+                    recipients.extend(self._students.get(student, ()))
+            for sub in recipients:
+                if len(sub.events) == self.queue_size:
+                    sub.dropped += 1
+                sub.events.append(text)
+                if sub.wake is not None:
+                    sub.wake()
+            self._cond.notify_all()
+
+    def take(self, sub, timeout):
+        # (encoded events, number dropped) queued for sub, waiting up to timeout
+        # seconds for the first one (not at all for 0)
+        with self._cond:
+            if timeout and not sub.events:
+                self._cond.wait(timeout)
+            events = list(sub.events)
+            sub.events.clear()
+            dropped, sub.dropped = sub.dropped, 0
+        return events, dropped
@@ -0,0 +1,78 @@
+import os, threading, time
+try:
+    import fcntl
+except ImportError:  # Windows: single-process only there, node 0
+    fcntl = None
+
+EPOCH_MS = 1704067200000  # 2024-01-01T00:00:00Z
+NODE_BITS = 10
+SEQUENCE_BITS = 12
+ID_ALPHABET = "0123456789abcdefghjkmnpqrstvwxyz"  # Crockford base32, in ASCII order
+ID_LENGTH = 13  # 65 bits of base32, so every 64-bit id has the same width
+
+_claimed = []  # lock files held open for the life of the process
+
+
+def encode_id(n):
+    out = []
+    for _ in range(ID_LENGTH):
+        out.append(ID_ALPHABET[n & 31])
+        n >>= 5
+    return "".join(reversed(out))
+
+
+def claim_node(prefix):
+    # The lowest node number no other live process on this host holds: an
+    # flock on prefix.<n>, released by the OS when the process exits
+    if fcntl is None:
+        return 0
+    for node in range(1 << NODE_BITS):
+        f = open("%s.%d" % (prefix, node), "a")
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            f.close()
+            continue
+        _claimed.append(f)
+        return node
+    raise RuntimeError("all %d node ids under %s are taken" % (1 << NODE_BITS, prefix))
+
+
+class IdGenerator:
+    """64-bit time-ordered ids: milliseconds since EPOCH_MS, node, sequence.
+
+    42 bits of time (good until 2163), 10 bits of node and 12 of sequence,
+    so each process mints up to 4096 ids a millisecond and no two processes
+    share a node. Ids are written as 13 fixed-width base32 characters: they
+    sort as strings in the order they were minted and survive JSON and
+    JavaScript, which would round a 64-bit number.
+
+    The node is claimed on first use from the lock files under ``prefix``
+    (every writer shares the data files, so they share a host too), and
+    claimed again after a fork so each worker gets its own.
+    """
+
+    def __init__(self, prefix):
+        self.prefix = prefix
+        self.node = None
+        self._lock = threading.Lock()
+        self._pid = None
+        self._last = -1
+        self._sequence = 0
+
+    def next(self):
+        with self._lock:
+            if self._pid != os.getpid():
+                self.node = claim_node(self.prefix)
+                self._pid = os.getpid()
+                self._last = -1
+            # a clock stepped backwards keeps counting in the last millisecond
+            now = max(int(time.time() * 1000) - EPOCH_MS, self._last)
+            if now == self._last:
+                self._sequence = (self._sequence + 1) & ((1 << SEQUENCE_BITS) - 1)
+                if self._sequence == 0:
+                    now += 1  # this millisecond is used up: borrow the next one
+            else:
+                self._sequence = 0
+            self._last = now
+            return encode_id(now << (NODE_BITS + SEQUENCE_BITS) | self.node << SEQUENCE_BITS | self._sequence)
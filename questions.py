@@ -0,0 +1,78 @@
+import json, random, threading
+from collections import OrderedDict
+
+ANSWER_DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+
+
+def sample_indices(n, k, rng):
+    # Partial Fisher-Yates over a virtual 0..n-1 array: only the swapped slots
+    # are stored, so drawing k of n costs O(k) time and memory whatever n is
+    swapped = {}
+    out = []
+    for i in range(min(k, n)):
+        j = rng.randrange(i, n)
+        out.append(swapped.get(j, j))
+        swapped[j] = swapped.get(i, i)
+    return out
+
+
+def pack_answers(answers):
+    # One character per question: the chosen option index in base 36,
+    # "-" when unanswered. "2013" is answers [2, 0, 1, 3].
+    return "".join(ANSWER_DIGITS[a] if 0 <= a < len(ANSWER_DIGITS) else "-" for a in answers)
+
+
+def feedback_for(score):
+    return "Excellent!" if score >= 80 else "Good job!" if score >= 60 else "Keep practicing!"
+
+
+def new_seed():
+    return random.getrandbits(53)  # stays exact as a JSON number
+
+
+class QuestionBank:
+    """The quiz questions, loaded once and indexed by (topic, difficulty)."""
+
+    def __init__(self, path):
+        with open(path, "r", encoding="utf-8") as f:
+            bank = json.load(f)
+        self._pools = {}
+        for topic, levels in bank.items():
+            for difficulty, questions in levels.items():
+                self._pools[(topic, difficulty)] = questions
+        self.topics = sorted({topic for topic, _ in self._pools})
+
+    def pool(self, topic, difficulty):
+        return self._pools.get((topic, difficulty), [])
+
+    def has_topic(self, topic):
+        return topic in self.topics
+
+    def sample(self, topic, difficulty, n, seed):
+        # n distinct questions (fewer if the pool is smaller); the same seed
+        # always draws the same questions from the same bank
+        pool = self.pool(topic, difficulty)
+        return [pool[i] for i in sample_indices(len(pool), n, random.Random(seed))]
+
+
+class PendingQuizzes:
+    """Answer keys of quizzes handed out but not yet submitted.
+
+    Bounded: once full, the oldest quiz is forgotten. Each entry is taken
+    exactly once by submit.
+    """
+
+    def __init__(self, limit):
+        self.limit = limit
+        self._quizzes = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, quiz_id, quiz):
+        with self._lock:
+            self._quizzes[quiz_id] = quiz
+            while len(self._quizzes) > self.limit:
+                self._quizzes.popitem(last=False)
+
+    def take(self, quiz_id):
+        with self._lock:
+            return self._quizzes.pop(quiz_id, None)
@@ -0,0 +1,86 @@
+import math
+
+from storage import COLLECTIONS, parse_time
+
+ROLES = ("student", "educator")
+
+
+def _is_id(value):
+    return isinstance(value, str) and value != "" or isinstance(value, int) and not isinstance(value, bool)
+
+
+def _is_text(value):
+    return isinstance(value, str) and value.strip() != ""
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+def _is_count(value):
+    return isinstance(value, int) and not isinstance(value, bool) and value >= 0
+
+
+def _is_date(value):
+    # stored as epoch ms, so it has to be a date parse_time can read
+    return (isinstance(value, str) or _is_number(value)) and parse_time(value) is not None
+
+
+def _is_answers(value):
+    return isinstance(value, str) or isinstance(value, list) and all(isinstance(a, int) for a in value)
+
+
+# field -> (required, check, what the value must be)
+SCHEMAS = {
+    "users": {
+        "user_id": (True, _is_id, "an id"),
+        "username": (True, _is_text, "a non-empty string"),
+        "role": (True, lambda v: v in ROLES, "one of " + ", ".join(ROLES)),
+        "email": (False, lambda v: isinstance(v, str), "a string"),
+        "password": (False, _is_text, "a non-empty string"),
+    },
+    "quizzes": {
+        "quiz_id": (True, _is_id, "an id"),
+        "user_id": (True, _is_id, "an id"),
+        "topic": (True, _is_text, "a non-empty string"),
+        "difficulty": (True, _is_text, "a non-empty string"),
+        "score": (True, lambda v: _is_number(v) and 0 <= v <= 100, "a number from 0 to 100"),
+        "correct_answers": (False, _is_count, "a count"),
+        "total_questions": (False, _is_count, "a count"),
+        "quiz_date": (False, _is_date, "epoch milliseconds or an ISO date"),
+        "feedback": (False, lambda v: isinstance(v, str), "a string"),
+        "seed": (False, _is_count, "a count"),
+        "answers": (False, _is_answers, "a string or a list of integers"),
+    },
+    "encouragements": {
+        "encouragement_id": (True, _is_id, "an id"),
+        "educator_id": (True, _is_id, "an id"),
+        "student_id": (True, _is_id, "an id"),
+        "message": (True, _is_text, "a non-empty string"),
+        "sent_date": (False, _is_date, "epoch milliseconds or an ISO date"),
+    },
+}
+
+
+def compile_validator(schema):
+    # One closure per collection with the field checks unpacked into a tuple,
+    # so validating a record is a single pass without dict lookups per rule
+    rules = tuple((field, required, check, "%s must be %s" % (field, what))
+                  for field, (required, check, what) in schema.items())
+
+    def validate(record):
+        # The first problem with record as a message, None when it is valid
+        if not isinstance(record, dict):
+            return "Expected a JSON object"
+        for field, required, check, message in rules:
+            if field not in record:
+                if required:
+                    return "%s is required" % field
+                continue
+            if not check(record[field]):
+                return message
+        return None
+    return validate
+
+
+VALIDATORS = {name: compile_validator(SCHEMAS[name]) for name in COLLECTIONS}
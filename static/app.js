@@ -0,0 +1,650 @@
+/* == JS: cleaned + adapted to use the Flask endpoints == */
+
+const defaultConfig = {
+  app_title: "🎓 EduTutor AI",
+  welcome_message: "Personalized Learning with Generative AI and LMS Integration"
+};
+
+let currentUser = null;
+let currentQuiz = null;
+let quizAnswers = [];
+let googleSynced = false;
+let syncedCourses = [];
+let allUsers = [];
+let allQuizzes = [];
+let allEncouragements = [];
+let syncVersion = null;  // change version our copy of the data is current to
+let eventSource = null;
+
+/* follow next_cursor through every page of a query endpoint */
+async function fetchAll(url) {
+  const items = [];
+  let cursor = null;
+  do {
+    const res = await fetch(url + (url.includes('?') ? '&' : '?') + 'limit=500' + (cursor ? '&cursor=' + cursor : ''));
+    const page = await res.json();
+    items.push(...page.items);
+    cursor = page.next_cursor;
+  } while (cursor);
+  return items;
+}
+
+async function fetchData() {
+  try {
+    if (currentUser && currentUser.role === 'student') {
+      // a student's views only ever look at their own quizzes; the version
+      // is read first, so a quiz stored meanwhile comes again as a change
+      const res = await fetch('/api/changes?type=quizzes');
+      const version = (await res.json()).version;
+      allQuizzes = await fetchAll('/api/quizzes?user_id=' + encodeURIComponent(currentUser.user_id));
+      syncVersion = version;
+      return;
+    }
+    const res = await fetch('/api/data');
+    syncVersion = Number(res.headers.get('X-Change-Version'));
+    const combined = await res.json();
+    // original code expected arrays filtered by keys; mimic that:
+    allUsers = combined.filter(it => it.role);
+    allQuizzes = combined.filter(it => it.quiz_id);
+    allEncouragements = combined.filter(it => it.encouragement_id);
+  } catch (e) {
+    console.error(e);
+    allUsers = []; allQuizzes = []; allEncouragements = [];
+  }
+}
+
+/* pull only what was created since the last sync; reload everything if that is too far back */
+const ID_FIELDS = { users: 'user_id', quizzes: 'quiz_id', encouragements: 'encouragement_id' };
+async function syncData() {
+  if (syncVersion === null) return fetchData();
+  try {
+    const student = currentUser && currentUser.role === 'student';
+    const res = await fetch('/api/changes?since=' + syncVersion + (student ? '&type=quizzes' : ''));
+    const body = await res.json();
+    if (!body.isOk) throw new Error(body.message);
+    if (body.reset) {
+      syncVersion = body.version;
+      return fetchData();
+    }
+    const lists = { users: allUsers, quizzes: allQuizzes, encouragements: allEncouragements };
+    body.changes.forEach(({ type, record }) => {
+      if (student && record.user_id !== currentUser.user_id) return;
+      const id = ID_FIELDS[type];
+      const i = lists[type].findIndex(it => it[id] === record[id]);
+      if (i < 0) lists[type].push(record); else lists[type][i] = record;
+    });
+    syncVersion = body.version;
+  } catch (e) {
+    console.error(e);
+    await fetchData();
+  }
+}
+
+/* live updates pushed by the server while a dashboard is open */
+const pendingRefresh = new Set();
+function refreshSoon(fn) {
+  // coalesce a burst of events into one redraw per view
+  if (pendingRefresh.has(fn)) return;
+  pendingRefresh.add(fn);
+  setTimeout(() => { pendingRefresh.delete(fn); fn(); }, 500);
+}
+
+function isShown(id) {
+  return !document.getElementById(id).classList.contains('hidden');
+}
+
+// view, redrawn once syncData has pulled in the full records an event announced
+const afterSync = new Map();
+function synced(view) {
+  if (!afterSync.has(view)) afterSync.set(view, async () => { await syncData(); view(); });
+  return afterSync.get(view);
+}
+
+function openEvents() {
+  closeEvents();
+  eventSource = new EventSource('/api/events?user_id=' + encodeURIComponent(currentUser.user_id));
+  const educator = currentUser.role === 'educator';
+  // the quiz payload is a summary: the full record comes from the change feed
+  eventSource.addEventListener('quiz', () => {
+    if (!educator) refreshSoon(synced(updateStudentStats));
+    else if (isShown('educator-analytics')) refreshSoon(synced(updateEducatorDashboard));
+    else if (isShown('educator-students')) refreshSoon(synced(updateStudentsList));
+    else if (isShown('educator-encourage')) refreshSoon(synced(updateEncouragementSection));
+    else refreshSoon(syncData);
+  });
+  eventSource.addEventListener('leaderboard', () => {
+    if (educator && isShown('educator-leaderboard')) refreshSoon(updateLeaderboard);
+  });
+  eventSource.addEventListener('encouragement', () => {
+    if (!educator) refreshSoon(updateStudentInbox);
+    else if (isShown('educator-encourage')) refreshSoon(updateEncouragementSection);
+  });
+  // our queue overflowed on the server: catch up from the change feed
+  eventSource.addEventListener('dropped', () => syncData());
+}
+
+function closeEvents() {
+  if (eventSource) eventSource.close();
+  eventSource = null;
+}
+
+/* small helper: POST a record to its collection */
+async function createItem(collection, obj) {
+  const res = await fetch('/api/' + collection, {
+    method: 'POST',
+    headers: {'Content-Type':'application/json'},
+    body: JSON.stringify(obj)
+  });
+  return res.json();
+}
+
+/* UI message helper */
+function showMessage(msg, type='info') {
+  const container = document.getElementById('message-container');
+  const div = document.createElement('div');
+  div.className = type==='error' ? 'error-message' : type==='success' ? 'success-message' : 'info-message';
+  div.textContent = msg;
+  container.appendChild(div);
+  setTimeout(() => { if (div.parentNode) div.parentNode.removeChild(div); }, 4000);
+}
+
+/* basic util */
+// dates are epoch milliseconds stamped by the server; records from before
+// that still carry the locale string they were written with
+function showDate(v) {
+  return typeof v === 'number' ? new Date(v).toLocaleString() : (v || '');
+}
+
+/* initialize */
+async function initializeApp() {
+  // data is fetched after login, and only what that user's views need
+  // apply default config
+  document.getElementById('app-title').textContent = defaultConfig.app_title;
+  document.getElementById('welcome-message').textContent = defaultConfig.welcome_message;
+}
+
+/* Tab switching (auth) */
+document.querySelectorAll('.tab').forEach(btn => {
+  btn.addEventListener('click', () => {
+    document.querySelectorAll('.tab').forEach(t=>t.classList.remove('active'));
+    document.querySelectorAll('.tab-content').forEach(c=>c.classList.remove('active'));
+    btn.classList.add('active');
+    const tab = btn.dataset.tab;
+    document.getElementById(tab + '-tab').classList.add('active');
+  });
+});
+
+/* Nav (student) */
+document.querySelectorAll('#student-dashboard .nav-btn').forEach(btn => {
+  btn.addEventListener('click', (e) => {
+    document.querySelectorAll('#student-dashboard .nav-btn').forEach(b=>b.classList.remove('active'));
+    btn.classList.add('active');
+    const sec = btn.dataset.section;
+    document.querySelectorAll('#student-dashboard .dashboard-content').forEach(c=>c.classList.add('hidden'));
+    const el = document.getElementById('student-' + sec);
+    if (el) el.classList.remove('hidden');
+    if (sec === 'history') updateQuizHistory();
+  });
+});
+
+/* Nav (educator) */
+document.querySelectorAll('#educator-dashboard .nav-btn').forEach(btn => {
+  btn.addEventListener('click', (e) => {
+    document.querySelectorAll('#educator-dashboard .nav-btn').forEach(b=>b.classList.remove('active'));
+    btn.classList.add('active');
+    const sec = btn.dataset.edu;
+    document.querySelectorAll('#educator-dashboard .dashboard-content').forEach(c=>c.classList.add('hidden'));
+    const el = document.getElementById('educator-' + sec);
+    if (el) el.classList.remove('hidden');
+    if (sec === 'students') updateStudentsList();
+    if (sec === 'analytics') updateEducatorAnalytics();
+    if (sec === 'leaderboard') updateLeaderboard();
+    if (sec === 'encourage') updateEncouragementSection();
+  });
+});
+
+/* Auth handlers */
+async function postJSON(url, obj) {
+  const res = await fetch(url, {
+    method: 'POST',
+    headers: {'Content-Type':'application/json'},
+    body: JSON.stringify(obj || {})
+  });
+  return res.json();
+}
+
+document.getElementById('register-form').addEventListener('submit', async (e) => {
+  e.preventDefault();
+  const username = document.getElementById('reg-username').value.trim();
+  const email = document.getElementById('reg-email').value.trim();
+  const pw = document.getElementById('reg-password').value;
+  const cpw = document.getElementById('reg-confirm').value;
+  const role = document.getElementById('reg-role').value;
+  if (!username || !email || !pw || !cpw || !role) { showMessage('Please fill all fields','error'); return; }
+  if (pw !== cpw) { showMessage('Passwords do not match','error'); return; }
+  const resp = await postJSON('/api/register', { username, email, password: pw, role });
+  if (resp.isOk) {
+    showMessage('Registration successful! You can login now','success');
+    document.getElementById('register-form').reset();
+    // switch to login tab
+    document.querySelectorAll('.tab').forEach(t=>t.classList.remove('active'));
+    document.querySelectorAll('.tab-content').forEach(c=>c.classList.remove('active'));
+    document.querySelector('.tab[data-tab="login"]').classList.add('active');
+    document.getElementById('login-tab').classList.add('active');
+  } else {
+    showMessage(resp.message || 'Registration failed','error');
+  }
+});
+
+document.getElementById('login-form').addEventListener('submit', async (e) => {
+  e.preventDefault();
+  const username = document.getElementById('login-username').value.trim();
+  const pw = document.getElementById('login-password').value;
+  const resp = await postJSON('/api/login', { username, password: pw });
+  if (!resp.isOk) { showMessage(resp.message || 'Invalid username or password','error'); return; }
+  currentUser = resp.user;
+  await syncData();
+  showDashboard();
+  showMessage('Login successful!','success');
+});
+
+/* Google login simulator */
+document.getElementById('google-login-btn').addEventListener('click', async () => {
+  showMessage('Connecting to Google Classroom...','info');
+  setTimeout(async () => {
+    // create or reuse a dummy google user
+    const demo = { username: 'google_user_demo', password: 'google_auth' };
+    let resp = await postJSON('/api/login', demo);
+    if (!resp.isOk) {
+      await postJSON('/api/register', { ...demo, email: 'student@google.com', role: 'student' });
+      resp = await postJSON('/api/login', demo);
+    }
+    if (!resp.isOk) { showMessage('Google login failed','error'); return; }
+    currentUser = resp.user;
+    // sync courses
+    const res = await fetch('/api/sync_google', { method:'POST' });
+    const data = await res.json();
+    if (data.isOk) {
+      googleSynced = true;
+      syncedCourses = data.courses;
+      await syncData();
+      updateGoogleSyncUI();
+      showDashboard();
+      showMessage('Google login successful! Courses synced automatically.','success');
+    } else {
+      showMessage('Google sync failed','error');
+    }
+  }, 1200);
+});
+
+/* logout */
+document.getElementById('logout-btn').addEventListener('click', () => {
+  closeEvents();
+  currentUser = null;
+  // the next user starts from their own data, not deltas on ours
+  syncVersion = null;
+  allUsers = []; allQuizzes = []; allEncouragements = [];
+  currentQuiz = null;
+  quizAnswers = [];
+  googleSynced = false;
+  syncedCourses = [];
+  document.getElementById('auth-section').classList.remove('hidden');
+  document.getElementById('dashboard-section').classList.add('hidden');
+  document.getElementById('login-form').reset();
+  document.getElementById('register-form').reset();
+  showMessage('Logged out','success');
+});
+
+/* Update UI functions */
+function showDashboard() {
+  document.getElementById('auth-section').classList.add('hidden');
+  document.getElementById('dashboard-section').classList.remove('hidden');
+  document.getElementById('dashboard-title').textContent = `Welcome, ${currentUser.username}!`;
+
+  if (currentUser.role === 'student') {
+    document.getElementById('student-dashboard').classList.remove('hidden');
+    document.getElementById('educator-dashboard').classList.add('hidden');
+    // show home
+    document.querySelectorAll('#student-dashboard .nav-btn').forEach(b=>b.classList.remove('active'));
+    document.querySelector('#student-dashboard .nav-btn[data-section="home"]').classList.add('active');
+    document.querySelectorAll('#student-dashboard .dashboard-content').forEach(c=>c.classList.add('hidden'));
+    document.getElementById('student-home').classList.remove('hidden');
+    updateStudentStats();
+    updateQuizHistory();
+    updateStudentInbox();
+  } else {
+    document.getElementById('educator-dashboard').classList.remove('hidden');
+    document.getElementById('student-dashboard').classList.add('hidden');
+    // show analytics
+    document.querySelectorAll('#educator-dashboard .nav-btn').forEach(b=>b.classList.remove('active'));
+    document.querySelector('#educator-dashboard .nav-btn[data-edu="analytics"]').classList.add('active');
+    document.querySelectorAll('#educator-dashboard .dashboard-content').forEach(c=>c.classList.add('hidden'));
+    document.getElementById('educator-analytics').classList.remove('hidden');
+    updateEducatorDashboard();
+    updateEncouragementSection();
+  }
+
+  // update topic options if google synced
+  updateGoogleSyncUI();
+  openEvents();
+}
+
+/* running aggregates kept by the server: O(1) however long the history */
+async function updateStudentStats() {
+  const res = await fetch('/api/stats/student/' + encodeURIComponent(currentUser.user_id));
+  const stats = (await res.json()).stats;
+  document.getElementById('total-quizzes').textContent = stats.total_quizzes;
+  document.getElementById('avg-score').textContent = stats.average_score.toFixed(1) + '%';
+  document.getElementById('last-topic').textContent = stats.last_topic || 'N/A';
+  updateRecentQuizzes(stats);
+}
+
+function updateRecentQuizzes(stats) {
+  const recent = stats.recent.slice().reverse();
+  const c = document.getElementById('recent-quizzes');
+  if (recent.length === 0) {
+    c.innerHTML = '<div class="info-message">No quiz history yet. Take your first quiz to get started!</div>';
+    return;
+  }
+  c.innerHTML = recent.map(q => `<div class="quiz-card"><strong>${q.topic}</strong> - ${q.difficulty}<br>Score: <strong>${q.score.toFixed(1)}%</strong> | Date: ${showDate(q.quiz_date)}<br>${q.feedback}</div>`).join('');
+}
+
+async function updateStudentInbox() {
+  const res = await fetch('/api/encouragements/inbox/' + encodeURIComponent(currentUser.user_id) + '?limit=5');
+  const inbox = (await res.json()).items;
+  const c = document.getElementById('student-inbox');
+  c.innerHTML = inbox.length===0?'<div class="info-message">No messages yet.</div>': inbox.map(enc => `<div style="padding:12px;margin:8px 0;background:#d4edda;border-radius:8px;border-left:4px solid #28a745;"><div style="display:flex;justify-content:space-between;margin-bottom:8px;"><strong>From: ${enc.educator_name || 'Your educator'}</strong><small>${showDate(enc.sent_date)}</small></div><div style="font-style:italic">"${enc.message}"</div></div>`).join('');
+}
+
+function updateGoogleSyncUI() {
+  if (googleSynced) {
+    document.getElementById('google-sync-indicator').classList.remove('hidden');
+    document.getElementById('synced-courses-count').textContent = ` ${syncedCourses.length} courses available`;
+    const topic = document.getElementById('quiz-topic');
+    topic.innerHTML = '<option value="">Choose Topic</option>';
+    syncedCourses.forEach(course => {
+      const opt = document.createElement('option'); opt.value = course.name; opt.textContent = course.name + ' (Google Classroom)'; topic.appendChild(opt);
+    });
+    ['Mathematics','Science','History','English','Physics','Biology','Chemistry','Geography','Computer Science'].forEach(t => { const o = document.createElement('option'); o.value = t; o.textContent = t; topic.appendChild(o); });
+    document.getElementById('sync-disconnected').classList.add('hidden');
+    document.getElementById('sync-connected').classList.remove('hidden');
+    const list = document.getElementById('synced-courses-list'); list.innerHTML = syncedCourses.map(c=>`<div class="quiz-card"><strong>${c.name}</strong><br>Section: ${c.section}</div>`).join('');
+  }
+}
+
+/* Quiz flow */
+document.getElementById('quiz-questions').addEventListener('input', function(){ document.getElementById('questions-count').textContent = this.value; });
+
+document.getElementById('generate-quiz-btn').addEventListener('click', async () => {
+  const topic = document.getElementById('quiz-topic').value;
+  const difficulty = document.getElementById('quiz-difficulty').value;
+  const numQ = parseInt(document.getElementById('quiz-questions').value || 5);
+  
+  if (!topic || !difficulty) { 
+    showMessage('Please select topic and difficulty','error'); 
+    return; 
+  }
+  
+  showMessage('Generating quiz...','info');
+  
+  // questions are sampled server-side from the question bank
+  const params = new URLSearchParams({ user_id: currentUser.user_id, topic, difficulty, n: numQ });
+  const res = await fetch('/api/quiz/generate?' + params);
+  const data = await res.json();
+  if (!data.isOk) {
+    showMessage(data.message || 'Quiz generation failed','error');
+    return;
+  }
+  const selected = data.quiz.questions;
+  
+  currentQuiz = { 
+    quiz_id: data.quiz.quiz_id, 
+    topic, 
+    difficulty, 
+    seed: data.quiz.seed,
+    signature: data.quiz.signature,
+    questions: selected, 
+    startTime: new Date().toISOString() 
+  };
+  quizAnswers = new Array(selected.length).fill(-1);
+  document.getElementById('quiz-setup').classList.add('hidden');
+  document.getElementById('quiz-interface').classList.remove('hidden');
+  document.getElementById('quiz-results').classList.add('hidden');
+  displayQuiz();
+  
+  if (selected.length < numQ) {
+    showMessage(`Generated ${selected.length} questions (maximum available for ${topic} ${difficulty})`,'info');
+  } else {
+    showMessage(`Quiz generated with ${selected.length} ${topic} questions`,'success');
+  }
+});
+
+function displayQuiz() {
+  document.getElementById('quiz-title').textContent = `Quiz: ${currentQuiz.topic} (${currentQuiz.difficulty}) - ${currentQuiz.questions.length} Questions`;
+  const container = document.getElementById('quiz-questions-container');
+  container.innerHTML = '';
+  currentQuiz.questions.forEach((q, i) => {
+    const div = document.createElement('div'); div.className = 'quiz-question';
+    let html = `<h4>Question ${i+1}</h4><p>${q.question}</p><div class="quiz-options">`;
+    q.options.forEach((opt, idx) => {
+      html += `<div class="quiz-option" data-q="${i}" data-opt="${idx}"><input type="radio" name="q${i}" id="q${i}_${idx}" value="${idx}"><label for="q${i}_${idx}">${opt}</label></div>`;
+    });
+    html += `</div>`;
+    div.innerHTML = html;
+    container.appendChild(div);
+  });
+  // attach click handlers
+  container.querySelectorAll('.quiz-option').forEach(el => {
+    el.addEventListener('click', () => {
+      const qi = parseInt(el.dataset.q), oi = parseInt(el.dataset.opt);
+      quizAnswers[qi] = oi;
+      // update radio
+      const radio = el.querySelector('input[type="radio"]');
+      if (radio) radio.checked = true;
+      updateQuizProgress();
+    });
+  });
+  updateQuizProgress();
+}
+
+function updateQuizProgress() {
+  const answered = quizAnswers.filter(a => a !== -1).length;
+  const total = currentQuiz.questions.length;
+  const pct = total === 0 ? 0 : Math.round((answered / total) * 100);
+  document.getElementById('quiz-progress').style.width = pct + '%';
+}
+
+document.getElementById('cancel-quiz-btn').addEventListener('click', () => {
+  currentQuiz = null; quizAnswers = [];
+  document.getElementById('quiz-setup').classList.remove('hidden');
+  document.getElementById('quiz-interface').classList.add('hidden');
+  document.getElementById('quiz-results').classList.add('hidden');
+});
+
+document.getElementById('submit-quiz-btn').addEventListener('click', async () => {
+  if (quizAnswers.includes(-1)) { showMessage('Please answer all questions','error'); return; }
+  // graded on the server, which holds the answer key
+  const resp = await postJSON('/api/quiz/submit', {
+    quiz_id: currentQuiz.quiz_id,
+    user_id: currentUser.user_id,
+    topic: currentQuiz.topic,
+    difficulty: currentQuiz.difficulty,
+    seed: currentQuiz.seed,
+    signature: currentQuiz.signature,
+    answers: quizAnswers
+  });
+  if (resp.isOk) {
+    const r = resp.result;
+    showQuizResults(r.score, r.correct_answers, r.total_questions, r.feedback);
+    showMessage('Quiz submitted successfully','success');
+    await syncData();
+    updateStudentStats();
+    updateQuizHistory();
+  } else {
+    showMessage(resp.message || 'Failed to save quiz results','error');
+  }
+});
+
+function showQuizResults(score, correct, total, feedback) {
+  document.getElementById('quiz-interface').classList.add('hidden');
+  document.getElementById('quiz-results').classList.remove('hidden');
+  document.getElementById('final-score').textContent = score.toFixed(1) + '%';
+  document.getElementById('score-feedback').textContent = feedback;
+  document.getElementById('score-details').textContent = `You got ${correct} out of ${total} questions correct!`;
+}
+
+document.getElementById('new-quiz-btn').addEventListener('click', () => {
+  currentQuiz = null; quizAnswers = [];
+  document.getElementById('quiz-setup').classList.remove('hidden');
+  document.getElementById('quiz-interface').classList.add('hidden');
+  document.getElementById('quiz-results').classList.add('hidden');
+});
+
+/* history */
+function updateQuizHistory() {
+  const userQuizzes = allQuizzes.filter(q => q.user_id === currentUser.user_id);
+  const container = document.getElementById('quiz-history-list');
+  if (userQuizzes.length === 0) {
+    container.innerHTML = '<div class="info-message">No quiz history available. Take a quiz to see your results here!</div>';
+    return;
+  }
+  const list = userQuizzes.slice().reverse().map(q => (
+`<div class="quiz-card"><div style="display:flex;justify-content:space-between;"><div><strong>${q.topic}</strong> - ${showDate(q.quiz_date)}</div><div style="font-weight:bold;color:${q.score>=80?'#28a745':q.score>=60?'#ffc107':'#dc3545'}">${q.score.toFixed(1)}%</div></div><div style="margin-top:8px;display:grid;grid-template-columns:repeat(3,1fr);gap:8px;"><div><strong>Score:</strong> ${q.score.toFixed(1)}%</div><div><strong>Correct:</strong> ${q.correct_answers}/${q.total_questions}</div><div><strong>Difficulty:</strong> ${q.difficulty}</div></div><div style="margin-top:8px;"><strong>Feedback:</strong> ${q.feedback}</div></div>`
+  )).join('');
+  container.innerHTML = list;
+}
+
+/* Google sync */
+document.getElementById('sync-google-btn').addEventListener('click', async () => {
+  showMessage('Connecting to Google Classroom...','info');
+  setTimeout(async () => {
+    const res = await fetch('/api/sync_google', { method:'POST' });
+    const data = await res.json();
+    if (data.isOk) {
+      googleSynced = true;
+      syncedCourses = data.courses;
+      updateGoogleSyncUI();
+      showMessage('Successfully synced with Google Classroom!','success');
+    } else showMessage('Google sync failed','error');
+  }, 800);
+});
+
+document.getElementById('disconnect-google-btn').addEventListener('click', () => {
+  googleSynced = false; syncedCourses = [];
+  document.getElementById('sync-connected').classList.add('hidden');
+  document.getElementById('sync-disconnected').classList.remove('hidden');
+  document.getElementById('google-sync-indicator').classList.add('hidden');
+  const topic = document.getElementById('quiz-topic');
+  topic.innerHTML = '<option value="">Choose Topic</option><option>Mathematics</option><option>Science</option><option>History</option><option>English</option><option>Physics</option><option>Biology</option><option>Chemistry</option><option>Geography</option><option>Computer Science</option>';
+  showMessage('Google Classroom disconnected','info');
+});
+
+/* Educator dashboard functions */
+async function updateEducatorDashboard() {
+  const students = await fetchAll('/api/stats/students');
+  let totalScore = 0, scoreCount = 0;
+  students.forEach(s => { totalScore += s.stats.score_sum; scoreCount += s.stats.total_quizzes; });
+  const classAvg = scoreCount>0 ? totalScore/scoreCount : 0;
+  document.getElementById('total-students').textContent = students.length;
+  document.getElementById('total-class-quizzes').textContent = allQuizzes.length;
+  document.getElementById('class-average').textContent = classAvg.toFixed(1) + '%';
+  renderStudentsList(students);
+  updateEducatorAnalytics();
+}
+
+/* subject and difficulty rollups come pre-aggregated from the server */
+async function updateEducatorAnalytics() {
+  const [bySubject, byDifficulty] = await Promise.all([
+    fetch('/api/analytics?group_by=topic').then(r=>r.json()),
+    fetch('/api/analytics?group_by=difficulty').then(r=>r.json())
+  ]);
+  renderAnalytics('subject-performance', bySubject.groups, 'topic');
+  renderAnalytics('difficulty-analysis', byDifficulty.groups, 'difficulty');
+}
+
+function renderAnalytics(id, groups, field) {
+  const container = document.getElementById(id);
+  if (groups.length === 0) { container.innerHTML = '<div class="info-message">No quiz data available yet.</div>'; return; }
+  container.innerHTML = groups.map(g => `<div style="display:flex;justify-content:space-between;padding:6px;border-bottom:1px solid #eee;"><span>${g[field]}</span><span style="font-weight:bold;color:${g.average>=80?'#28a745':g.average>=60?'#ffc107':'#dc3545'}">${g.average.toFixed(1)}% (${g.count} quizzes)</span></div>`).join('');
+}
+
+async function updateStudentsList() {
+  renderStudentsList(await fetchAll('/api/stats/students'));
+}
+
+function renderStudentsList(students) {
+  const container = document.getElementById('students-list');
+  if (students.length === 0) { container.innerHTML = '<div class="info-message">No student data available yet.</div>'; return; }
+  container.innerHTML = students.map(s => {
+    const st = s.stats;
+    const avg = st.average_score;
+    const lastTopic = st.last_topic || 'N/A';
+    const lastDate = showDate(st.last_date) || 'N/A';
+    const recent = st.recent.map(q => `<div>• ${q.topic}: ${q.score.toFixed(1)}% (${showDate(q.quiz_date)})</div>`).join('');
+    return `<div class="quiz-card"><div style="display:flex;justify-content:space-between;"><h4>${s.username}</h4><div style="font-weight:bold;color:${avg>=80?'#28a745':avg>=60?'#ffc107':'#dc3545'}">Avg: ${avg.toFixed(1)}%</div></div><div style="display:grid;grid-template-columns:repeat(4,1fr);gap:8px;margin-top:8px;"><div><strong>${s.email}</strong><div>Email</div></div><div><strong>${st.total_quizzes}</strong><div>Total Quizzes</div></div><div><strong>${lastTopic}</strong><div>Last Topic</div></div><div><strong>${lastDate}</strong><div>Last Quiz</div></div></div>${st.total_quizzes>0?`<div style="margin-top:8px;"><strong>Recent Performance:</strong>${recent}</div>`:''}</div>`;
+  }).join('');
+}
+
+/* leaderboard is maintained server-side as quizzes are recorded */
+async function updateLeaderboard() {
+  const res = await fetch('/api/leaderboard?k=10&active_k=5');
+  const board = await res.json();
+
+  const top = board.top;
+  const leaderboardContainer = document.getElementById('leaderboard-list');
+  if (top.length===0) leaderboardContainer.innerHTML = '<div class="info-message">No quiz data available yet.</div>';
+  else leaderboardContainer.innerHTML = top.map((s,i)=> {
+    const medal = i===0?'🥇':i===1?'🥈':i===2?'🥉':(i+1)+'.';
+    const color = s.average_score>=80? '#28a745': s.average_score>=60? '#ffc107':'#dc3545';
+    return `<div style="display:flex;justify-content:space-between;align-items:center;padding:8px;margin:6px 0;background:#fafafa;border-radius:8px;border-left:4px solid ${color};"><div style="display:flex;align-items:center;gap:12px;"><span style="font-weight:bold">${medal}</span><div><strong>${s.username}</strong><br><small>${s.total_quizzes} quizzes completed</small></div></div><div style="text-align:right;"><div style="font-weight:bold;color:${color}">${s.average_score.toFixed(1)}%</div><small>Average Score</small></div></div>`;
+  }).join('');
+
+  const mostActive = board.most_active;
+  const activeContainer = document.getElementById('most-active-list');
+  activeContainer.innerHTML = mostActive.length===0?'<div class="info-message">No student data available yet.</div>': mostActive.map(s=>`<div style="display:flex;justify-content:space-between;padding:8px;border-bottom:1px solid #eee;"><span>${s.username}</span><span style="font-weight:bold;color:#667eea">${s.total_quizzes} quizzes</span></div>`).join('');
+
+  const championsContainer = document.getElementById('subject-champions');
+  championsContainer.innerHTML = board.champions.length===0?'<div class="info-message">No subject data available yet.</div>': board.champions.map(ch=>`<div style="display:flex;justify-content:space-between;padding:8px;border-bottom:1px solid #eee;"><div><strong>${ch.subject}</strong><br><small>${ch.username}</small></div><span style="font-weight:bold;color:#28a745">${ch.score.toFixed(1)}%</span></div>`).join('');
+}
+
+async function updateEncouragementSection() {
+  const students = allUsers.filter(u => u.role === 'student');
+  const { students: low } = await (await fetch('/api/students/at-risk')).json();
+  const lowContainer = document.getElementById('low-performers-list');
+  if (low.length===0) lowContainer.innerHTML = '<div class="success-message">🎉 All students are performing well! No students need encouragement at this time.</div>';
+  else lowContainer.innerHTML = low.map(s => `<div style="display:flex;justify-content:space-between;padding:12px;margin:8px 0;background:#fff3cd;border-radius:8px;border-left:4px solid #ffc107;"><div><strong>${s.username}</strong><br><small>${s.email} • ${s.total_quizzes} quizzes completed</small></div><div style="text-align:right;"><div style="font-weight:bold;color:#856404">${s.average_score.toFixed(1)}%</div><small>Average Score</small></div></div>`).join('');
+
+  // update select
+  const sel = document.getElementById('encourage-student'); sel.innerHTML = '<option value="">Choose a student</option>';
+  students.forEach(s => { const o = document.createElement('option'); o.value = s.user_id; o.textContent = s.username + ' (' + s.email + ')'; sel.appendChild(o); });
+
+  // newest first, with student names joined in by the server
+  const res = await fetch('/api/encouragements/sent/' + encodeURIComponent(currentUser.user_id) + '?limit=10');
+  const history = (await res.json()).items;
+  const histContainer = document.getElementById('encouragement-history');
+  histContainer.innerHTML = history.length===0?'<div class="info-message">No encouragement messages sent yet.</div>': history.map(enc => `<div style="padding:12px;margin:8px 0;background:#d4edda;border-radius:8px;border-left:4px solid #28a745;"><div style="display:flex;justify-content:space-between;margin-bottom:8px;"><strong>To: ${enc.student_name || 'Unknown Student'}</strong><small>${showDate(enc.sent_date)}</small></div><div style="font-style:italic">"${enc.message}"</div></div>`).join('');
+}
+
+document.getElementById('send-encouragement-btn').addEventListener('click', async () => {
+  const studentId = document.getElementById('encourage-student').value;
+  const message = document.getElementById('encourage-message').value.trim();
+  if (!studentId) { showMessage('Please select a student','error'); return; }
+  if (!message) { showMessage('Please write an encouragement message','error'); return; }
+  const st = allUsers.find(u => u.user_id === studentId);
+  if (!st) { showMessage('Student not found','error'); return; }
+  // the server mints encouragement_id and stamps sent_date
+  const obj = { educator_id: currentUser.user_id, student_id: studentId, message };
+  const resp = await createItem('encouragements', obj);
+  if (resp.isOk) {
+    showMessage(`Encouragement message sent to ${st.username}!`, 'success');
+    document.getElementById('encourage-message').value = "Keep up the great work! I believe in your potential. Practice makes perfect. You've got this! 🌟";
+    document.getElementById('encourage-student').value = '';
+    await syncData();
+    updateEncouragementSection();
+  } else showMessage('Failed to send encouragement message','error');
+});
+
+/* boot */
+window.addEventListener('DOMContentLoaded', async () => {
+  await initializeApp();
+});
@@ -0,0 +1,266 @@
+import threading
+from bisect import bisect_left, insort
+from collections import deque
+
+RECENT_QUIZZES = 3
+
+
+def quiz_score(record):
+    try:
+        return float(record.get("score") or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class StudentStats:
+    """Running per-student quiz aggregates, updated as quizzes are stored.
+
+    Subscribed to the store, so reads are O(1) per student however long the
+    quiz history gets.
+    """
+
+    def __init__(self, recent=RECENT_QUIZZES):
+        self.recent = recent
+        self._lock = threading.Lock()
+        self._students = {}
+
+    def reset(self):
+        with self._lock:
+            self._students = {}
+
+    def add(self, collection, record):
+        if collection != "quizzes":
+            return
+        user_id = record.get("user_id")
+        with self._lock:
+            s = self._students.get(user_id)
+            if s is None:
+                s = self._students[user_id] = {"count": 0, "score_sum": 0.0, "last_topic": None,
+                                               "last_date": None, "recent": deque(maxlen=self.recent)}
+            score = quiz_score(record)
+            s["count"] += 1
+            s["score_sum"] += score
+            s["last_topic"] = record.get("topic")
+            s["last_date"] = record.get("quiz_date")
+            s["recent"].append({"topic": record.get("topic"), "difficulty": record.get("difficulty"),
+                                "score": score, "quiz_date": record.get("quiz_date"),
+                                "feedback": record.get("feedback")})
+
+    def get(self, user_id):
+        with self._lock:
+            s = self._students.get(user_id)
+            if s is None:
+                return {"user_id": user_id, "total_quizzes": 0, "score_sum": 0.0, "average_score": 0.0,
+                        "last_topic": None, "last_date": None, "recent": []}
+            return {"user_id": user_id, "total_quizzes": s["count"], "score_sum": s["score_sum"],
+                    "average_score": s["score_sum"] / s["count"], "last_topic": s["last_topic"],
+                    "last_date": s["last_date"], "recent": list(s["recent"])}
+
+
+class _Ranking:
+    """Members ordered by a numeric score, highest first (ties by user_id).
+
+    Keys live in short sorted buckets, so moving a member shifts at most one
+    bucket instead of a list as long as the whole ranking.
+    """
+
+    BUCKET = 512
+
+    def __init__(self):
+        self._buckets = []
+        self._maxes = []
+        self._key_of = {}
+
+    def _insert(self, key):
+        if not self._buckets:
+            self._buckets.append([key])
+            self._maxes.append(key)
+            return
+        i = min(bisect_left(self._maxes, key), len(self._buckets) - 1)
+        bucket = self._buckets[i]
+        insort(bucket, key)
+        self._maxes[i] = bucket[-1]
+        if len(bucket) > 2 * self.BUCKET:
+            self._buckets.insert(i + 1, bucket[self.BUCKET:])
+            del bucket[self.BUCKET:]
+            self._maxes.insert(i, bucket[-1])
+
+    def _remove(self, key):
+        i = bisect_left(self._maxes, key)
+        bucket = self._buckets[i]
+        del bucket[bisect_left(bucket, key)]
+        if bucket:
+            self._maxes[i] = bucket[-1]
+        else:
+            del self._buckets[i], self._maxes[i]
+
+    def set(self, user_id, score):
+        old = self._key_of.get(user_id)
+        if old is not None:
+            self._remove(old)
+        key = (-score, str(user_id), user_id)
+        self._insert(key)
+        self._key_of[user_id] = key
+
+    def discard(self, user_id):
+        old = self._key_of.pop(user_id, None)
+        if old is not None:
+            self._remove(old)
+
+    def iter(self, lowest_first=False):
+        buckets = reversed(self._buckets) if lowest_first else self._buckets
+        for bucket in buckets:
+            for neg_score, _, user_id in (reversed(bucket) if lowest_first else bucket):
+                yield user_id, -neg_score
+
+
+class Leaderboard:
+    """Top students by average score and by quiz count, plus subject champions.
+
+    Every stored quiz moves one student in each ranking (O(log n) search plus
+    a bucket insert), so reading the top K is O(K) instead of averaging and
+    sorting every student on every request. A subject's champion is the
+    student with the highest average among those whose best subject it is.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clear()
+
+    def _clear(self):
+        self._users = {}        # user_id -> (username, role)
+        self._students = {}     # user_id -> {"count", "sum", "topics": {topic: [sum, count]}, "best"}
+        self._by_average = _Ranking()
+        self._by_count = _Ranking()
+        self._champions = {}    # topic -> _Ranking of students whose best subject it is
+
+    def reset(self):
+        with self._lock:
+            self._clear()
+
+    def add(self, collection, record):
+        if collection == "users":
+            with self._lock:
+                self._users[record.get("user_id")] = (record.get("username"), record.get("role"))
+            return
+        if collection != "quizzes":
+            return
+        user_id = record.get("user_id")
+        score = quiz_score(record)
+        topic = record.get("topic")
+        with self._lock:
+            s = self._students.get(user_id)
+            if s is None:
+                s = self._students[user_id] = {"count": 0, "sum": 0.0, "topics": {}, "best": None}
+            s["count"] += 1
+            s["sum"] += score
+            t = s["topics"].setdefault(topic, [0.0, 0])
+            t[0] += score
+            t[1] += 1
+            self._by_average.set(user_id, s["sum"] / s["count"])
+            self._by_count.set(user_id, s["count"])
+            # best subject: highest average above 0, earliest subject wins ties
+            best, best_score = None, 0.0
+            for name, (total, count) in s["topics"].items():
+                if total / count > best_score:
+                    best, best_score = name, total / count
+            if s["best"] is not None and s["best"] != best:
+                self._champions[s["best"]].discard(user_id)
+            s["best"] = best
+            if best is not None:
+                self._champions.setdefault(best, _Ranking()).set(user_id, best_score)
+
+    def _top(self, ranking, k):
+        out = []
+        for user_id, score in ranking.iter():
+            username, role = self._users.get(user_id, (None, None))
+            if role != "student":
+                continue
+            out.append((user_id, username, score))
+            if len(out) >= k:
+                break
+        return out
+
+    def top(self, k=10):
+        with self._lock:
+            return [{"user_id": u, "username": name, "average_score": score,
+                     "total_quizzes": self._students[u]["count"]}
+                    for u, name, score in self._top(self._by_average, k)]
+
+    def most_active(self, k=5):
+        with self._lock:
+            return [{"user_id": u, "username": name, "total_quizzes": int(count)}
+                    for u, name, count in self._top(self._by_count, k)]
+
+    def champions(self):
+        with self._lock:
+            out = []
+            for subject, ranking in self._champions.items():
+                top = self._top(ranking, 1)
+                if top:
+                    user_id, username, score = top[0]
+                    out.append({"subject": subject, "user_id": user_id, "username": username, "score": score})
+            return out
+
+
+class AtRiskStudents:
+    """Students averaging under a threshold, lowest average first.
+
+    Students under the configured threshold with at least min_quizzes quizzes
+    have a ranking of their own, entered and left as quizzes move their
+    average across the line, so listing them costs O(result). Any other
+    threshold or minimum walks the ranking of all students up from the lowest
+    average and stops at the threshold.
+    """
+
+    def __init__(self, threshold=60.0, min_quizzes=1):
+        self.threshold = threshold
+        self.min_quizzes = min_quizzes
+        self._lock = threading.Lock()
+        self._clear()
+
+    def _clear(self):
+        self._users = {}        # user_id -> (username, email, role)
+        self._students = {}     # user_id -> [count, score_sum]
+        self._all = _Ranking()
+        self._at_risk = _Ranking()
+
+    def reset(self):
+        with self._lock:
+            self._clear()
+
+    def add(self, collection, record):
+        if collection == "users":
+            with self._lock:
+                self._users[record.get("user_id")] = (record.get("username"), record.get("email"), record.get("role"))
+            return
+        if collection != "quizzes":
+            return
+        user_id = record.get("user_id")
+        with self._lock:
+            s = self._students.setdefault(user_id, [0, 0.0])
+            s[0] += 1
+            s[1] += quiz_score(record)
+            average = s[1] / s[0]
+            self._all.set(user_id, average)
+            if s[0] >= self.min_quizzes and average < self.threshold:
+                self._at_risk.set(user_id, average)
+            else:
+                self._at_risk.discard(user_id)
+
+    def get(self, threshold=None, min_quizzes=None):
+        threshold = self.threshold if threshold is None else threshold
+        min_quizzes = self.min_quizzes if min_quizzes is None else min_quizzes
+        with self._lock:
+            indexed = threshold == self.threshold and min_quizzes == self.min_quizzes
+            out = []
+            for user_id, average in (self._at_risk if indexed else self._all).iter(lowest_first=True):
+                if average >= threshold:
+                    break
+                count = self._students[user_id][0]
+                username, email, role = self._users.get(user_id, (None, None, None))
+                if count < min_quizzes or role != "student":
+                    continue
+                out.append({"user_id": user_id, "username": username, "email": email,
+                            "average_score": average, "total_quizzes": count})
+            return out
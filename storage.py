@@ -0,0 +1,1020 @@
+import json, os, sqlite3, threading, time
+from bisect import bisect_left, bisect_right
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows: in-process locking only
+    fcntl = None
+
+COLLECTIONS = ("users", "quizzes", "encouragements")
+# Fields the query endpoints filter on; both backends keep an index per field
+INDEXED_FIELDS = {
+    "users": ("user_id", "username", "role"),
+    "quizzes": ("quiz_id", "user_id", "topic", "difficulty"),
+    "encouragements": ("encouragement_id", "educator_id", "student_id"),
+}
+# When each dated record was written, in epoch milliseconds (the server stamps
+# it; older records carry the browser's locale string until restamped)
+TIME_FIELDS = {"quizzes": "quiz_date", "encouragements": "sent_date"}
+_DATE_FORMATS = ("%m/%d/%Y %I:%M:%S %p", "%m/%d/%Y, %I:%M:%S %p", "%d/%m/%Y %H:%M:%S", "%d/%m/%Y, %H:%M:%S")
+
+
+def empty_data():
+    return {name: [] for name in COLLECTIONS}
+
+
+def parse_time(value):
+    # Epoch milliseconds for an ISO or en-US/en-GB locale date string, else None
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return int(value)
+    if not isinstance(value, str) or not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return int(value)
+    try:
+        return int(datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp() * 1000)
+    except ValueError:
+        pass
+    for fmt in _DATE_FORMATS:
+        try:
+            return int(datetime.strptime(value, fmt).timestamp() * 1000)
+        except ValueError:
+            continue
+    return None
+
+
+def now_ms():
+    return int(time.time() * 1000)
+
+
+def record_time(collection, record):
+    field = TIME_FIELDS.get(collection)
+    return parse_time(record.get(field)) if field else None
+
+
+def _index_key(value):
+    return value if value is None or isinstance(value, (str, int, float)) else None
+
+
+def classify(record):
+    # Which collection an untyped record belongs to, None if it cannot tell.
+    # Quiz results and encouragements carry user_id/educator_id too, so users
+    # are recognised by their own fields rather than by having an id.
+    if "role" in record or "username" in record:
+        return "users"
+    if "quiz_id" in record:
+        return "quizzes"
+    if "encouragement_id" in record:
+        return "encouragements"
+    return None
+
+
+def _misfiled(collection, record):
+    # The collection a stored record belongs in, None if it is already there
+    target = classify(record)
+    return target if target not in (None, collection) else None
+
+
+def _restamped(collection, record):
+    # The record with its TIME_FIELDS date as epoch ms; the record itself when
+    # it already is, or is missing or unreadable
+    field = TIME_FIELDS.get(collection)
+    value = record.get(field) if field else None
+    if value is None or type(value) is int:
+        return record
+    ts = parse_time(value)
+    return record if ts is None else dict(record, **{field: ts})
+
+
+def feed(listener, data):
+    # Replace a listener's state with the given collections. Listeners with a
+    # rebuild() take them in bulk; the rest are reset and fed record by record.
+    if hasattr(listener, "rebuild"):
+        listener.rebuild(data)
+        return
+    listener.reset()
+    for collection in COLLECTIONS:
+        for record in data.get(collection, ()):
+            listener.add(collection, record)
+
+
+class ChangeFeed:
+    """The last ``limit`` records stored, numbered by a change version.
+
+    The version is the number of records the store holds, so every process
+    arrives at the same one once it has seen the same writes. A full reload
+    that brings records this feed did not see one by one (another process
+    compacted, say) empties the window: their order is unknown, so clients
+    older than the reload fall back to a snapshot.
+    """
+
+    def __init__(self, limit):
+        self._lock = threading.Lock()
+        self._changes = deque(maxlen=limit)  # (version, collection, record)
+        self.version = 0
+
+    def reset(self):
+        with self._lock:
+            self._changes.clear()
+            self.version = 0
+
+    def rebuild(self, data):
+        total = sum(len(data.get(name, ())) for name in COLLECTIONS)
+        with self._lock:
+            if total != self.version:
+                self._changes.clear()
+                self.version = total
+
+    def add(self, collection, record):
+        with self._lock:
+            self.version += 1
+            self._changes.append((self.version, collection, record))
+
+    def since(self, version):
+        # (current version, [(collection, record)] stored after version), or
+        # (current version, None) when version is outside the window
+        with self._lock:
+            oldest = self._changes[0][0] - 1 if self._changes else self.version
+            if version is None or not oldest <= version <= self.version:
+                return self.version, None
+            out = []
+            for v, collection, record in reversed(self._changes):
+                if v <= version:
+                    break
+                out.append((collection, record))
+            out.reverse()
+            return self.version, out
+
+
+class DuplicateError(ValueError):
+    pass
+
+
+class _Pending:
+    __slots__ = ("collection", "record", "unique", "seq", "done", "error")
+
+    def __init__(self, collection, record, unique=None, seq=None):
+        self.collection = collection
+        self.record = record
+        self.unique = unique
+        self.seq = seq
+        self.done = False
+        self.error = None
+
+
+class BaseStore:
+    """Group commit and change listeners shared by the backends.
+
+    Writers queue their record; whichever thread finds no flush in progress
+    commits every queued record with one ``_commit(batch)`` while the others
+    wait for it.
+
+    Listeners (aggregates kept beside the store) get ``reset()`` followed by
+    ``add(collection, record)`` for every stored record, then ``add`` for
+    each record written afterwards by any process, once ``refresh()`` or a
+    write has noticed it.
+
+    With an ``archive`` (see archive.QuizArchive), old quizzes can be moved
+    out of the store; reads, queries and listener feeds still see them, in
+    front of the live ones and under their original seqs.
+    """
+
+    def __init__(self, archive=None):
+        self._cond = threading.Condition()
+        self._queue = []
+        self._flushing = False
+        self._listeners = []
+        self.archive = archive
+
+    def insert(self, collection, record, unique=None):
+        # unique names a field (or a tuple of fields) that must not already
+        # be taken; checked under the commit lock so racing creates cannot
+        # both win
+        pending = _Pending(collection, record, unique)
+        with self._cond:
+            self._queue.append(pending)
+            while not pending.done:
+                if self._flushing:
+                    self._cond.wait()
+                    continue
+                # become the leader and commit everything queued so far
+                self._flushing = True
+                batch, self._queue = self._queue, []
+                self._cond.release()
+                error = None
+                try:
+                    self._commit(batch)
+                except Exception as e:
+                    error = e
+                finally:
+                    self._cond.acquire()
+                    for p in batch:
+                        p.done = True
+                        if error is not None:
+                            p.error = error
+                    self._flushing = False
+                    self._cond.notify_all()
+        if pending.error is not None:
+            raise pending.error
+        return record
+
+    def insert_many(self, items):
+        # (collection, record, unique) triples committed together as one
+        # batch; returns each one's error, None where it was stored
+        batch = [_Pending(collection, record, unique) for collection, record, unique in items]
+        with self._cond:
+            while self._flushing:
+                self._cond.wait()
+            self._flushing = True
+        try:
+            self._commit(batch)
+        except Exception as e:
+            for p in batch:
+                p.error = p.error or e
+        finally:
+            with self._cond:
+                self._flushing = False
+                self._cond.notify_all()
+        return [p.error for p in batch]
+
+    def _accepted(self, batch):
+        # Drop (and fail) records whose unique field(s) are already taken
+        out, seen = [], set()
+        for p in batch:
+            fields = (p.unique,) if isinstance(p.unique, str) else p.unique or ()
+            keys = [(p.collection, field, p.record.get(field)) for field in fields]
+            taken = next((key for key in keys if key in seen or self._exists(*key)), None)
+            if taken is not None:
+                p.error = DuplicateError("%s %r already exists" % (taken[1], taken[2]))
+                continue
+            seen.update(keys)
+            out.append(p)
+        return out
+
+    def _exists(self, collection, field, value):
+        raise NotImplementedError
+
+    def _commit(self, batch):
+        raise NotImplementedError
+
+    def subscribe(self, listener):
+        raise NotImplementedError
+
+    def refresh(self):
+        raise NotImplementedError
+
+    def refile(self):
+        # Move records stored under the wrong collection (creates used to
+        # file quiz results under users) to the one classify() names. They
+        # go to the end of their new collection, so records already there
+        # keep their seqs. Returns {"users->quizzes": n, ...}.
+        raise NotImplementedError
+
+    def restamp(self):
+        # Rewrite dates older versions stored as the browser's locale string
+        # as epoch ms, in place (seqs and order unchanged). Returns
+        # {collection: n} for the dated collections; archived quizzes are
+        # already read back as epoch ms.
+        raise NotImplementedError
+
+    def _with_archive(self, data):
+        if self.archive is None:
+            return data
+        return dict(data, quizzes=self.archive.chain(data["quizzes"]))
+
+    def records(self, collection):
+        records = self._records(collection)
+        if collection == "quizzes" and self.archive is not None:
+            return self.archive.chain(records)
+        return records
+
+    def query(self, collection, filters=None, after=None, since=None, limit=50, newest_first=False):
+        # Records matching every filter, in insertion order, as (seq, record)
+        # pairs with seq > after (newest_first: reversed, seq < after).
+        # Archived quizzes all precede the live ones. since only applies to
+        # the dated collections, as in export.
+        if collection not in TIME_FIELDS:
+            since = None
+        if collection != "quizzes" or self.archive is None or not len(self.archive):
+            return self._query(collection, filters, after, since, limit, newest_first)
+        if newest_first:
+            out = self._query(collection, filters, after, since, limit, True)
+            if len(out) < limit:
+                out += self.archive.query(filters, after, since, limit - len(out), True)
+            return out
+        out = self.archive.query(filters, after, since, limit)
+        if len(out) >= limit:
+            return out
+        after = self.archive.last_seq() if after is None else max(after, self.archive.last_seq())
+        return out + self._query(collection, filters, after, since, limit - len(out))
+
+    def archive_quizzes(self, cutoff):
+        # Move the leading run of quizzes dated before cutoff (epoch ms) into
+        # the archive; returns how many moved. The newest quiz always stays
+        # live so new seqs keep counting up from it.
+        last = self.archive.last_seq()
+        if last is not None:
+            # finish a run that stopped between archiving and trimming
+            self._trim("quizzes", last)
+        rows, after, done = [], None, False
+        while not done:
+            page = self._query("quizzes", after=after, limit=1000)
+            if not page:
+                rows = rows[:-1]
+                break
+            for seq, record in page:
+                ts = record_time("quizzes", record)
+                if ts is None or ts >= cutoff:
+                    done = True
+                    break
+                rows.append((seq, record))
+            after = page[-1][0]
+        if not rows:
+            return 0
+        self.archive.append(rows)
+        self._trim("quizzes", rows[-1][0])
+        return len(rows)
+
+
+class DataStore(BaseStore):
+    """Resident copy of the users/quizzes/encouragements collections.
+
+    The JSON file is parsed once; later reads are served from memory and only
+    reloaded when the snapshot or log changes size/mtime behind our back.
+    In "wal" mode creates append one line to ``<path>.log`` and the snapshot
+    is rewritten only on compaction; in "json" mode every commit rewrites it.
+
+    Commits are serialised by a thread lock plus an flock on ``<path>.lock``.
+    """
+
+    def __init__(self, path, mode="wal", fsync_batch=32, fsync_interval=1.0, compact_every=5000, archive=None):
+        super().__init__(archive)
+        self.path = path
+        self.log_path = path + ".log"
+        self.lock_path = path + ".lock"
+        self.mode = mode
+        self.fsync_batch = fsync_batch
+        self.fsync_interval = fsync_interval
+        self.compact_every = compact_every
+        self.data = None
+        self._sig = None
+        self._seq = 0
+        self._log_offset = 0
+        self._fh = None
+        self._pending = 0
+        self._synced_at = 0.0
+        self._flush_timer = None
+        self._since_compact = 0
+        self._lock = threading.RLock()
+
+    @contextmanager
+    def _locked(self, shared=False):
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            with open(self.lock_path, "a") as lf:
+                fcntl.flock(lf, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lf, fcntl.LOCK_UN)
+
+    def _signature(self):
+        sig = []
+        for p in (self.path, self.log_path):
+            try:
+                st = os.stat(p)
+                sig.append((st.st_ino, st.st_mtime_ns, st.st_size))
+            except FileNotFoundError:
+                sig.append(None)
+        return tuple(sig)
+
+    def _read_snapshot(self):
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, "r", encoding="utf-8") as f:
+            try:
+                return json.load(f)
+            except ValueError as e:
+                # snapshots are replaced atomically, so this is real damage:
+                # refuse to start rather than treat it as an empty school
+                raise ValueError("%s is not valid JSON: %s" % (self.path, e))
+
+    def _exists(self, collection, field, value):
+        return bool(self._indexes[collection][field].get(value))
+
+    def _reindex(self):
+        self._indexes = {c: {f: {} for f in INDEXED_FIELDS[c]} for c in COLLECTIONS}
+        self._times = {c: [] for c in TIME_FIELDS}
+        for collection in COLLECTIONS:
+            for pos, record in enumerate(self.data[collection]):
+                self._index(collection, pos, record)
+        # (times ascending, their positions) per dated collection, records
+        # without a readable date left out: since= bisects into it
+        self._by_time = {}
+        for collection, times in self._times.items():
+            order = sorted((ts, pos) for pos, ts in enumerate(times) if ts is not None)
+            self._by_time[collection] = ([ts for ts, _ in order], [pos for _, pos in order])
+
+    def _index(self, collection, pos, record):
+        for field, index in self._indexes[collection].items():
+            index.setdefault(_index_key(record.get(field)), []).append(pos)
+        if collection in self._times:
+            self._times[collection].append(record_time(collection, record))
+
+    def _append(self, collection, record):
+        records = self.data[collection]
+        records.append(record)
+        pos = len(records) - 1
+        self._index(collection, pos, record)
+        ts = self._times[collection][pos] if collection in self._times else None
+        if ts is not None:
+            # server-stamped records arrive in time order: an append at the end
+            keys, positions = self._by_time[collection]
+            i = bisect_right(keys, ts)
+            keys.insert(i, ts)
+            positions.insert(i, pos)
+        for listener in self._listeners:
+            listener.add(collection, record)
+
+    def _feed(self, listeners):
+        data = self._with_archive(self.data)
+        for listener in listeners:
+            feed(listener, data)
+
+    def subscribe(self, listener):
+        with self._lock:
+            self._listeners.append(listener)
+            if self.data is not None:
+                self._feed([listener])
+
+    def _replay_log(self, seq, offset=0):
+        # Apply log entries newer than seq from byte offset on; returns the
+        # last seq seen and the offset just past the last complete line
+        if not os.path.exists(self.log_path):
+            return seq, 0
+        with open(self.log_path, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # torn tail from a crash (or a writer) mid-append
+                    break
+                offset += len(line)
+                entry = json.loads(line)
+                if entry["seq"] <= seq:
+                    continue
+                self._append(entry["collection"], entry["record"])
+                seq = entry["seq"]
+        return seq, offset
+
+    def _load(self):
+        data = self._read_snapshot()
+        if data is None:
+            data = empty_data()
+        for name in COLLECTIONS:
+            data.setdefault(name, [])
+        self.data = data
+        self._reindex()
+        self._feed(self._listeners)
+        self._seq, self._log_offset = self._replay_log(data.get("log_seq", 0))
+        self._drop_torn_tail()
+        self._sig = self._signature()
+        return data
+
+    def _drop_torn_tail(self):
+        # A crash mid-append leaves a partial last line that replay skips; cut
+        # it off so the next append starts a line of its own. Only called
+        # under the flock, so no writer is mid-append.
+        try:
+            size = os.path.getsize(self.log_path)
+        except FileNotFoundError:
+            return
+        if size > self._log_offset:
+            with open(self.log_path, "r+b") as f:
+                f.truncate(self._log_offset)
+
+    def _refresh(self):
+        # Catch up with writes made by other processes. If only the log grew
+        # (same snapshot, same log file) replay just the new tail.
+        sig = self._signature()
+        if self.data is not None and sig == self._sig:
+            return
+        old = self._sig
+        if (self.data is None or old is None or sig[0] != old[0] or sig[1] is None
+                or old[1] is None or sig[1][0] != old[1][0] or sig[1][2] < self._log_offset):
+            self._load()
+            return
+        self._seq, self._log_offset = self._replay_log(self._seq, self._log_offset)
+        self._sig = self._signature()
+
+    def load(self):
+        with self._locked():
+            if not os.path.exists(self.path) and not os.path.exists(self.log_path):
+                self._write_snapshot(empty_data())
+            return self._load()
+
+    def snapshot(self):
+        if self.data is None or self._signature() != self._sig:
+            with self._locked(shared=True):
+                self._refresh()
+        return self.data
+
+    def refresh(self):
+        self.snapshot()
+
+    def _records(self, collection):
+        return self.snapshot()[collection]
+
+    def _query(self, collection, filters=None, after=None, since=None, limit=50, newest_first=False):
+        # seq is the record's position in the list plus the number of records
+        # trimmed off its front. Walks the shortest index list among the
+        # filtered fields and, for since, the records the time index puts
+        # from since on; backwards for newest_first.
+        records = self.snapshot()[collection]
+        base = self.data.get("seq_base", {}).get(collection, 0)
+        filters = filters or {}
+        candidates = range(len(records))
+        for field, value in filters.items():
+            positions = self._indexes[collection][field].get(value, [])
+            if len(positions) < len(candidates):
+                candidates = positions
+        times = self._times.get(collection)
+        if since is not None and times is not None:
+            keys, positions = self._by_time[collection]
+            start = bisect_left(keys, since)
+            if len(keys) - start < len(candidates):
+                # already in position order unless dates were imported out of order
+                candidates = sorted(positions[start:])
+        if newest_first:
+            end = len(candidates) if after is None else bisect_left(candidates, after - base)
+            walk = range(end - 1, -1, -1)
+        else:
+            walk = range(0 if after is None else bisect_right(candidates, after - base), len(candidates))
+        out = []
+        for i in walk:
+            pos = candidates[i]
+            record = records[pos]
+            if any(record.get(f) != v for f, v in filters.items()):
+                continue
+            if since is not None and (times[pos] is None or times[pos] < since):
+                continue
+            out.append((base + pos, record))
+            if len(out) >= limit:
+                break
+        return out
+
+    def _write_snapshot(self, data):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+    def _sync_log(self, force=False):
+        if self._fh is None or not self._pending:
+            return
+        now = time.monotonic()
+        if force or self._pending >= self.fsync_batch or now - self._synced_at >= self.fsync_interval:
+            self._fh.flush()
+            os.fsync(self._fh.fileno())
+            self._pending = 0
+            self._synced_at = now
+        elif self._flush_timer is None:
+            # no later commit may come along to do it: fsync what is left
+            # once the interval is up
+            self._flush_timer = threading.Timer(self.fsync_interval - (now - self._synced_at), self._flush_late)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def _flush_late(self):
+        with self._lock:
+            self._flush_timer = None
+            self._sync_log(force=True)
+
+    def _open_log(self):
+        # another process may have compacted the log away since we opened it
+        if self._fh is not None:
+            try:
+                current = os.stat(self.log_path).st_ino
+            except FileNotFoundError:
+                current = None
+            if current != os.fstat(self._fh.fileno()).st_ino:
+                self._fh.close()
+                self._fh = None
+        if self._fh is None:
+            self._fh = open(self.log_path, "ab")
+        return self._fh
+
+    def _commit(self, batch):
+        with self._locked():
+            self._refresh()
+            batch = self._accepted(batch)
+            if not batch:
+                return
+            data = self.data
+            if self.mode != "wal":
+                for p in batch:
+                    self._append(p.collection, p.record)
+                try:
+                    self._write_snapshot(data)
+                except Exception:
+                    for p in reversed(batch):
+                        data[p.collection].pop()
+                    self._reindex()
+                    self._feed(self._listeners)
+                    raise
+                self._sig = self._signature()
+                return
+            # another process may have crashed mid-append since we loaded
+            self._drop_torn_tail()
+            lines = []
+            seq = self._seq
+            for p in batch:
+                seq += 1
+                entry = {"seq": seq, "collection": p.collection, "record": p.record}
+                lines.append(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+            chunk = "".join(lines).encode("utf-8")
+            fh = self._open_log()
+            fh.write(chunk)
+            fh.flush()
+            self._seq = seq
+            self._log_offset += len(chunk)
+            for p in batch:
+                self._append(p.collection, p.record)
+            self._pending += len(batch)
+            self._since_compact += len(batch)
+            self._sync_log()
+            # our own append is not a reason to reload
+            self._sig = self._signature()
+            if self._since_compact >= self.compact_every:
+                self._compact()
+
+    def _compact(self):
+        # Rewrite the snapshot from memory, then start a fresh log segment.
+        # The snapshot records the last folded seq so a crash before the log is
+        # removed never replays an entry twice.
+        self._sync_log(force=True)
+        data = self.data
+        data["log_seq"] = self._seq
+        self._write_snapshot(data)
+        self.close()
+        if os.path.exists(self.log_path):
+            os.remove(self.log_path)
+        self._log_offset = 0
+        self._since_compact = 0
+        self._sig = self._signature()
+
+    def compact(self):
+        with self._locked():
+            self._refresh()
+            self._compact()
+
+    def refile(self):
+        with self._locked():
+            self._refresh()
+            moves, moved = {}, {c: [] for c in COLLECTIONS}
+            for collection in COLLECTIONS:
+                kept = []
+                for record in self.data[collection]:
+                    target = _misfiled(collection, record)
+                    if target is None:
+                        kept.append(record)
+                        continue
+                    moved[target].append(record)
+                    key = "%s->%s" % (collection, target)
+                    moves[key] = moves.get(key, 0) + 1
+                self.data[collection] = kept
+            if not moves:
+                return moves
+            for collection, records in moved.items():
+                self.data[collection].extend(records)
+            self._reindex()
+            self._compact()
+            self._feed(self._listeners)
+            return moves
+
+    def restamp(self):
+        with self._locked():
+            self._refresh()
+            counts = dict.fromkeys(TIME_FIELDS, 0)
+            for collection in TIME_FIELDS:
+                records = self.data[collection]
+                for pos, record in enumerate(records):
+                    new = _restamped(collection, record)
+                    if new is not record:
+                        records[pos] = new
+                        counts[collection] += 1
+            if any(counts.values()):
+                # the parsed times are the same, so the indexes still hold
+                self._compact()
+                self._feed(self._listeners)
+            return counts
+
+    def _trim(self, collection, upto):
+        # Drop the leading records with seq <= upto (they have been archived)
+        with self._locked():
+            self._refresh()
+            base = self.data.get("seq_base", {}).get(collection, 0)
+            drop = upto + 1 - base
+            if drop <= 0:
+                return
+            del self.data[collection][:drop]
+            self.data.setdefault("seq_base", {})[collection] = base + drop
+            self._reindex()
+            self._compact()
+
+    def close(self):
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            self._sync_log(force=True)
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+
+
+# Indexed columns pulled out of each record; the full record is kept in doc
+# (ts is the parsed TIME_FIELDS date in epoch milliseconds)
+SQLITE_COLUMNS = {
+    "users": ("user_id", "username", "role"),
+    "quizzes": ("quiz_id", "user_id", "topic", "difficulty", "score", "ts"),
+    "encouragements": ("encouragement_id", "educator_id", "student_id", "ts"),
+}
+SQLITE_INDEXES = (
+    ("users", ("user_id",)),
+    ("users", ("username",)),
+    ("users", ("role",)),
+    ("quizzes", ("quiz_id",)),
+    ("quizzes", ("user_id",)),
+    ("quizzes", ("topic", "difficulty")),
+    ("quizzes", ("difficulty",)),
+    ("quizzes", ("ts",)),
+    ("quizzes", ("user_id", "ts")),
+    ("encouragements", ("encouragement_id",)),
+    ("encouragements", ("educator_id",)),
+    ("encouragements", ("student_id",)),
+    ("encouragements", ("ts",)),
+)
+SQLITE_CHANGES_KEEP = 100000  # change rows compact() keeps for lagging processes
+
+
+def _column_values(collection, record):
+    values = []
+    for column in SQLITE_COLUMNS[collection]:
+        value = record_time(collection, record) if column == "ts" else record.get(column)
+        if value is not None and not isinstance(value, (str, int, float)):
+            value = json.dumps(value, ensure_ascii=False)
+        values.append(value)
+    return values
+
+
+class SqliteStore(BaseStore):
+    """The three collections as SQLite tables (WAL journal, one connection per thread)."""
+
+    def __init__(self, path, archive=None):
+        super().__init__(archive)
+        self.path = path
+        self._local = threading.local()
+        self._ready = False
+        # id of the last row of the changes table handed to the listeners
+        self._tail = 0
+        self._deliver_lock = threading.RLock()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, isolation_level=None, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            if not self._ready:
+                self._create_schema(conn)
+                self._ready = True
+        return conn
+
+    def _create_schema(self, conn):
+        for table, columns in SQLITE_COLUMNS.items():
+            conn.execute("CREATE TABLE IF NOT EXISTS %s (seq INTEGER PRIMARY KEY, %s, doc TEXT NOT NULL)"
+                         % (table, ", ".join(columns)))
+            # databases created before a column existed get it added and backfilled
+            existing = {row[1] for row in conn.execute("PRAGMA table_info(%s)" % table)}
+            missing = [c for c in columns if c not in existing]
+            if not missing:
+                continue
+            conn.execute("BEGIN IMMEDIATE")
+            for column in missing:
+                conn.execute("ALTER TABLE %s ADD COLUMN %s" % (table, column))
+            rows = conn.execute("SELECT seq, doc FROM %s" % table).fetchall()
+            for seq, doc in rows:
+                values = dict(zip(columns, _column_values(table, json.loads(doc))))
+                conn.execute("UPDATE %s SET %s WHERE seq = ?" % (table, ", ".join("%s = ?" % c for c in missing)),
+                             [values[c] for c in missing] + [seq])
+            conn.execute("COMMIT")
+        for table, columns in SQLITE_INDEXES:
+            conn.execute("CREATE INDEX IF NOT EXISTS %s_%s ON %s (%s)"
+                         % (table, "_".join(columns), table, ", ".join(columns)))
+        # every create in commit order, written in its transaction, so all
+        # processes hand records to their listeners in the same order
+        conn.execute("CREATE TABLE IF NOT EXISTS changes (id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                     " collection TEXT NOT NULL, seq INTEGER NOT NULL)")
+
+    def load(self):
+        self._conn()
+
+    def is_empty(self):
+        conn = self._conn()
+        return not any(conn.execute("SELECT 1 FROM %s LIMIT 1" % t).fetchone() for t in COLLECTIONS)
+
+    @contextmanager
+    def _snapshot(self):
+        # One read transaction: everything read inside sees the same commits
+        conn = self._conn()
+        conn.execute("BEGIN")
+        try:
+            yield conn
+        finally:
+            conn.execute("COMMIT")
+
+    def _feed_all(self, conn, listeners):
+        # Feed listeners the full tables and move the tail to the last change
+        data = {table: [json.loads(doc) for (doc,) in conn.execute("SELECT doc FROM %s ORDER BY seq" % table)]
+                for table in COLLECTIONS}
+        self._tail = conn.execute("SELECT COALESCE(MAX(id), 0) FROM changes").fetchone()[0]
+        for listener in listeners:
+            feed(listener, self._with_archive(data))
+
+    def _catch_up(self, conn):
+        # Hand the changes after the tail to the listeners in commit order;
+        # False when some are gone (pruned, or the row was archived since),
+        # and the listeners need the full tables instead
+        rows = conn.execute("SELECT id, collection, seq FROM changes WHERE id > ? ORDER BY id",
+                            (self._tail,)).fetchall()
+        if rows and rows[0][0] != self._tail + 1:
+            return False
+        for change, collection, seq in rows:
+            row = conn.execute("SELECT doc FROM %s WHERE seq = ?" % collection, (seq,)).fetchone()
+            if row is None:
+                return False
+            record = json.loads(row[0])
+            for listener in self._listeners:
+                listener.add(collection, record)
+            self._tail = change
+        return True
+
+    def subscribe(self, listener):
+        # The current listeners are caught up first, so the new one starts
+        # from exactly the records they have seen
+        with self._deliver_lock, self._snapshot() as conn:
+            if self._listeners and not self._catch_up(conn):
+                self._feed_all(conn, self._listeners)
+            self._listeners.append(listener)
+            self._feed_all(conn, [listener])
+
+    def refresh(self):
+        # Hand records committed since the last call (by any connection) to
+        # the listeners; a rowid range scan, so nearly free when nothing is new
+        if not self._listeners:
+            return
+        with self._deliver_lock, self._snapshot() as conn:
+            if not self._catch_up(conn):
+                self._feed_all(conn, self._listeners)
+
+    def _records(self, collection):
+        cur = self._conn().execute("SELECT doc FROM %s ORDER BY seq" % collection)
+        for (doc,) in cur:
+            yield json.loads(doc)
+
+    def _query(self, collection, filters=None, after=None, since=None, limit=50, newest_first=False):
+        where, params = [], []
+        for field, value in (filters or {}).items():
+            where.append("%s = ?" % field)
+            params.append(value)
+        if after is not None:
+            where.append("seq < ?" if newest_first else "seq > ?")
+            params.append(after)
+        if since is not None:
+            where.append("ts >= ?")
+            params.append(since)
+        sql = "SELECT seq, doc FROM %s" % collection
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        order = " ORDER BY seq DESC LIMIT ?" if newest_first else " ORDER BY seq LIMIT ?"
+        cur = self._conn().execute(sql + order, params + [limit])
+        return [(seq, json.loads(doc)) for seq, doc in cur]
+
+    def _exists(self, collection, field, value):
+        sql = "SELECT 1 FROM %s WHERE %s = ? LIMIT 1" % (collection, field)
+        return self._conn().execute(sql, (value,)).fetchone() is not None
+
+    def _commit(self, batch):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for p in self._accepted(batch):
+                seq = self._insert_row(conn, p.collection, p.seq, p.record)
+                conn.execute("INSERT INTO changes (collection, seq) VALUES (?, ?)", (p.collection, seq))
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        self.refresh()
+
+    @staticmethod
+    def _insert_row(conn, collection, seq, record):
+        # returns the row's seq
+        columns = SQLITE_COLUMNS[collection]
+        cur = conn.execute("INSERT INTO %s (seq, %s, doc) VALUES (%s)"
+                           % (collection, ", ".join(columns), ", ".join("?" * (len(columns) + 2))),
+                           [seq] + _column_values(collection, record) + [json.dumps(record, ensure_ascii=False)])
+        return cur.lastrowid
+
+    def refile(self):
+        # Moves are not changes (nothing new was created), so other processes'
+        # listeners only see them once they restart
+        conn = self._conn()
+        moves = {}
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for collection in COLLECTIONS:
+                for seq, doc in conn.execute("SELECT seq, doc FROM %s ORDER BY seq" % collection).fetchall():
+                    record = json.loads(doc)
+                    target = _misfiled(collection, record)
+                    if target is None:
+                        continue
+                    self._insert_row(conn, target, None, record)
+                    conn.execute("DELETE FROM %s WHERE seq = ?" % collection, (seq,))
+                    key = "%s->%s" % (collection, target)
+                    moves[key] = moves.get(key, 0) + 1
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        if moves:
+            with self._deliver_lock, self._snapshot() as conn:
+                self._feed_all(conn, self._listeners)
+        return moves
+
+    def restamp(self):
+        conn = self._conn()
+        counts = dict.fromkeys(TIME_FIELDS, 0)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for collection in TIME_FIELDS:
+                for seq, doc in conn.execute("SELECT seq, doc FROM %s ORDER BY seq" % collection).fetchall():
+                    record = json.loads(doc)
+                    new = _restamped(collection, record)
+                    if new is record:
+                        continue
+                    conn.execute("UPDATE %s SET doc = ? WHERE seq = ?" % collection,
+                                 (json.dumps(new, ensure_ascii=False), seq))
+                    counts[collection] += 1
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        if any(counts.values()):
+            with self._deliver_lock, self._snapshot() as conn:
+                self._feed_all(conn, self._listeners)
+        return counts
+
+    def compact(self):
+        conn = self._conn()
+        conn.execute("DELETE FROM changes WHERE id <= (SELECT MAX(id) FROM changes) - ?", (SQLITE_CHANGES_KEEP,))
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def _trim(self, collection, upto):
+        self._conn().execute("DELETE FROM %s WHERE seq <= ?" % collection, (upto,))
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def migrate_json(json_path, target):
+    """Copy data.json (and its log) into an empty SQLite store; returns counts."""
+    if not target.is_empty():
+        raise ValueError("%s already has data; refusing to migrate twice" % target.path)
+    data = DataStore(json_path).load()
+    batch = []
+    counts = dict.fromkeys(COLLECTIONS, 0)
+    # quizzes go first and keep their seqs, so pagination cursors and the
+    # quiz archive stay valid; everything else is numbered after them
+    for name in ("quizzes", "users", "encouragements"):
+        base = data.get("seq_base", {}).get(name, 0)
+        for pos, record in enumerate(data[name]):
+            # older data.json files filed quiz results under users
+            collection = classify(record) or name
+            counts[collection] += 1
+            seq = base + pos if name == "quizzes" and collection == "quizzes" else None
+            batch.append(_Pending(collection, record, seq=seq))
+    target._commit(batch)
+    return counts